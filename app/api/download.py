@@ -3,20 +3,21 @@
 Design原則: 13. コンストレイント - 制約で誤操作を防ぐ
 """
 from fastapi import APIRouter, HTTPException, Request, Header
-from fastapi.responses import FileResponse
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from fastapi.responses import Response, StreamingResponse
+import asyncio
 import zipfile
+import hashlib
 from pathlib import Path
-from datetime import datetime
-import json
+from typing import BinaryIO, Iterator
+import os
+import time
 
 from config.settings import settings
-from app.services.storage import load_job, save_job
-from app.services.notification import PINManager
+from app.utils.rate_limit import limiter
+from app.services.storage import load_job, save_job, job_timestamp, paths_for
+from app.services.pin_manager import pin_manager
 
 router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
 
 @router.get("/jobs/{job_id}/download")
 @limiter.limit(f"{settings.RATE_LIMIT_DOWNLOADS_PER_MINUTE}/minute")
@@ -28,16 +29,17 @@ async def download_job(
     """
     納品物ダウンロード（PIN認証必須）
     """
-    job_path = settings.JOBS_DIR / f"{job_id}.json"
-    if not job_path.exists():
+    paths = paths_for(job_id)
+    if not paths.job_json.exists():
         raise HTTPException(status_code=404, detail="ジョブが見つかりません")
     
     # PIN検証（Design原則: 15. エラーを回避する）
-    is_valid, error_msg = PINManager.verify_pin(job_id, x_pin)
+    is_valid, error_msg = await pin_manager.verify_pin_async(job_id, x_pin)
     if not is_valid:
         raise HTTPException(status_code=403, detail=error_msg)
     
-    job = load_job(job_id)
+    # job.jsonの読み込み・保存はディスクとRedisを使うため、イベントループの外で行う
+    job = await asyncio.to_thread(load_job, job_id)
     
     # ステータス確認
     if job["status"] != "COMPLETED":
@@ -47,13 +49,12 @@ async def download_job(
         )
     
     # 期限確認
-    if job.get("expires_at"):
-        expires = datetime.fromisoformat(job["expires_at"].replace("Z", "+00:00"))
-        if datetime.utcnow() > expires:
-            raise HTTPException(
-                status_code=410,
-                detail="納品物は保持期限切れで削除されました"
-            )
+    expires_ts = job_timestamp(job, "expires_at")
+    if expires_ts is not None and time.time() > expires_ts:
+        raise HTTPException(
+            status_code=410,
+            detail="納品物は保持期限切れで削除されました"
+        )
     
     # ダウンロード回数チェック
     if job.get("download_count", 0) >= 5:
@@ -62,56 +63,217 @@ async def download_job(
             detail="ダウンロード回数上限に達しました（最大5回）"
         )
     
-    # ZIPファイル作成
-    output_dir = settings.OUTPUT_DIR / job_id
-    if not output_dir.exists():
+    # 納品物を先に開いておく（欠けていればストリーム開始前に500を返せる）
+    try:
+        delivery_files = open_delivery_files(paths.output_dir, job)
+    except FileNotFoundError:
         raise HTTPException(
             status_code=500,
             detail="納品物が見つかりません（内部エラー）"
         )
     
-    zip_path = settings.TEMP_DIR / f"dub_{job_id}.zip"
-    create_delivery_zip(output_dir, zip_path, job)
+    # 同じ納品物を取得済みのクライアントには本体を送らない（回数も消費しない）
+    text_entries = delivery_text_entries(job)
+    etag = delivery_etag(job_id, delivery_files, text_entries)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        for _, f in delivery_files:
+            f.close()
+        return Response(status_code=304, headers={"ETag": etag})
     
     # ダウンロード回数を更新
     job["download_count"] = job.get("download_count", 0) + 1
-    save_job(job)
+    await asyncio.to_thread(save_job, job)
     
-    return FileResponse(
-        path=zip_path,
+    # ZIPは一時ファイルを作らず、生成しながら送信する
+    filename = f"talkdub_{job['languages']['tgt_lang']}.zip"
+    return StreamingResponse(
+        stream_delivery_zip(delivery_files, text_entries),
         media_type="application/zip",
-        filename=f"talkdub_{job['languages']['tgt_lang']}.zip",
         headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "ETag": etag,
             "X-Download-Count": str(job["download_count"]),
             "X-Expires-At": job.get("expires_at", "")
         }
     )
 
-def create_delivery_zip(output_dir: Path, zip_path: Path, job: dict):
-    """納品ZIPファイル作成"""
-    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-        # dub_*.wav
-        dub_wav = output_dir / f"dub_{job['languages']['tgt_lang']}.wav"
-        if dub_wav.exists():
-            zf.write(dub_wav, dub_wav.name)
-        
-        # manifest.json
-        manifest = output_dir / "manifest.json"
-        if manifest.exists():
-            zf.write(manifest, manifest.name)
-        
-        # segments_*.json
-        segments = output_dir / f"segments_{job['languages']['tgt_lang']}.json"
-        if segments.exists():
-            zf.write(segments, segments.name)
-        
-        # UPLOAD_GUIDE.txt
-        guide_text = generate_upload_guide(job)
-        zf.writestr("UPLOAD_GUIDE.txt", guide_text)
-        
-        # README.txt
-        readme_text = generate_readme(job)
-        zf.writestr("README.txt", readme_text)
+# ストリーミング送信のチャンクサイズ（100KiB以上でシステムコール数が減る）
+ZIP_STREAM_CHUNK_SIZE = 256 * 1024
+
+# 納品ZIPに入れる成果物（job["outputs"] のキー、ZIP内の並び順）
+DELIVERY_OUTPUT_KEYS = ("dub_wav", "manifest_json", "segments_json")
+
+# JSON/テキストの圧縮レベル（3で圧縮率はほぼ変わらず、既定の6より高速）
+ZIP_TEXT_COMPRESSLEVEL = 3
+
+# ZIPの組み立て方を変えたら上げる（ETagに含め、古いキャッシュと一致させない）
+ZIP_LAYOUT_VERSION = "2"
+
+# ZIPの日時はDOS形式のため1980年より前を表せない
+ZIP_MIN_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+class _ZipStreamBuffer:
+    """
+    ZipFileの書き込み先（シーク不可のバッファ）
+    書かれたバイト列を溜めておき、drain()でレスポンスへ渡す
+    """
+    
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+    
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self._position
+    
+    @property
+    def pending(self) -> int:
+        """未送信のバイト数"""
+        return len(self._buffer)
+    
+    def flush(self) -> None:
+        pass
+    
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+def open_delivery_files(output_dir: Path, job: dict) -> list[tuple[str, BinaryIO]]:
+    """
+    job["outputs"] に記録された納品物を開く
+    Returns: [(ZIP内の名前, ファイルオブジェクト)]
+    Raises: FileNotFoundError（記録があるのに実体が無い＝サーバー側の不整合）
+    """
+    opened = []
+    try:
+        for key in DELIVERY_OUTPUT_KEYS:
+            recorded = job["outputs"].get(key)
+            if recorded is None:
+                continue
+            path = output_dir / recorded  # 絶対パスならそのまま
+            opened.append((path.name, path.open("rb")))
+    except OSError:
+        for _, f in opened:
+            f.close()
+        raise
+    return opened
+
+def delivery_text_entries(job: dict) -> list[tuple[zipfile.ZipInfo, str]]:
+    """
+    ZIPに添えるテキスト（日時はジョブ作成時刻で固定し、生成のたびにバイト列が変わらないようにする）
+    Returns: [(ZipInfo, 本文)]
+    """
+    date_time = _zip_date_time(job_timestamp(job, "created_at") or 0)
+    entries = []
+    for arcname, text in (
+        ("UPLOAD_GUIDE.txt", generate_upload_guide(job)),
+        ("README.txt", generate_readme(job)),
+    ):
+        zinfo = zipfile.ZipInfo(arcname, date_time=date_time)
+        zinfo.external_attr = 0o644 << 16
+        entries.append((zinfo, text))
+    return entries
+
+def delivery_etag(
+    job_id: str,
+    delivery_files: list[tuple[str, BinaryIO]],
+    text_entries: list[tuple[zipfile.ZipInfo, str]]
+) -> str:
+    """
+    納品ZIPのETag（ZIPを作らずに算出）
+    ZIPのバイト列は成果物のサイズ・更新時刻・添付テキストから一意に決まる
+    （日時はUTC・固定値）ため、それらをハッシュして強いETagとする
+    """
+    h = hashlib.sha256(f"{ZIP_LAYOUT_VERSION}:{job_id}".encode())
+    for arcname, f in delivery_files:
+        st = os.fstat(f.fileno())
+        h.update(f"{arcname}:{st.st_size}:{st.st_mtime_ns}".encode())
+    for zinfo, text in text_entries:
+        h.update(f"{zinfo.filename}:{zinfo.date_time}:".encode())
+        h.update(text.encode())
+    return f'"{h.hexdigest()[:32]}"'
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    If-None-Matchの判定（カンマ区切りの複数指定・"*"・W/付きに対応）
+    If-None-Matchは弱い比較（RFC 9110 13.1.2）のため、W/の有無は区別しない
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+def _zip_date_time(timestamp: float) -> tuple[int, int, int, int, int, int]:
+    """Unix秒 → ZIPの日時（サーバーのタイムゾーンに依存しないようUTC）"""
+    return max(time.gmtime(timestamp)[:6], ZIP_MIN_DATE_TIME)
+
+def _zipinfo_for(arcname: str, f: BinaryIO) -> zipfile.ZipInfo:
+    """開済みファイルからZipInfo生成（stat はfstat 1回だけ）"""
+    st = os.fstat(f.fileno())
+    zinfo = zipfile.ZipInfo(arcname, date_time=_zip_date_time(st.st_mtime))
+    zinfo.file_size = st.st_size
+    zinfo.external_attr = (st.st_mode & 0xFFFF) << 16
+    return zinfo
+
+def stream_delivery_zip(
+    delivery_files: list[tuple[str, BinaryIO]],
+    text_entries: list[tuple[zipfile.ZipInfo, str]]
+) -> Iterator[bytes]:
+    """
+    納品ZIPをチャンク単位で生成
+    Design原則: 65. 0.1秒以内に反応を返す - 先頭バイトをすぐ返す
+    """
+    buffer = _ZipStreamBuffer()
+    
+    try:
+        # WAVはほぼ圧縮が効かないのでSTOREDで素通し（CPUを使わない）
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as zf:
+            # dub_*.wav, manifest.json, segments_*.json
+            for arcname, src in delivery_files:
+                zinfo = _zipinfo_for(arcname, src)
+                
+                if arcname.endswith(".wav"):
+                    zinfo.compress_type = zipfile.ZIP_STORED
+                    with zf.open(zinfo, 'w') as dest:
+                        while chunk := src.read(ZIP_STREAM_CHUNK_SIZE):
+                            dest.write(chunk)
+                            if buffer.pending >= ZIP_STREAM_CHUNK_SIZE:
+                                yield buffer.drain()
+                else:
+                    # JSONは軽いDEFLATE
+                    zf.writestr(
+                        zinfo,
+                        src.read(),
+                        compress_type=zipfile.ZIP_DEFLATED,
+                        compresslevel=ZIP_TEXT_COMPRESSLEVEL
+                    )
+            
+            # UPLOAD_GUIDE.txt, README.txt
+            for zinfo, text in text_entries:
+                zf.writestr(
+                    zinfo,
+                    text,
+                    compress_type=zipfile.ZIP_DEFLATED,
+                    compresslevel=ZIP_TEXT_COMPRESSLEVEL
+                )
+    
+        # セントラルディレクトリを含む残り
+        yield buffer.drain()
+    finally:
+        for _, f in delivery_files:
+            f.close()
 
 def generate_upload_guide(job: dict) -> str:
     """YouTube Studio アップロード手順書"""
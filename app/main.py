@@ -4,17 +4,24 @@ Design原則: 1. シンプルにする、65. 0.1秒以内に反応を返す
 """
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
+from starlette.datastructures import MutableHeaders
+from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
+import anyio.to_thread
+import asyncio
 import logging
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from config.settings import settings
 from app.api import jobs, download
+from app.utils.rate_limit import limiter
+from app.services.notification import close_resend_client
+from app.services.redis_client import close_async_redis
 
 # ログ設定
 logging.basicConfig(
@@ -27,15 +34,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# レート制限（Design原則: 15. エラーを回避する）
-limiter = Limiter(key_func=get_remote_address)
-
 app = FastAPI(
     title="MultiLang Voice Lab",
     description="多言語音声変換研究プラットフォーム",
     version="0.1.0",
     docs_url="/api/docs" if settings.DEBUG else None,  # 本番では無効化
-    redoc_url=None
+    redoc_url=None,
+    default_response_class=ORJSONResponse
 )
 
 app.state.limiter = limiter
@@ -51,18 +56,42 @@ app.add_middleware(
 )
 
 # セキュリティヘッダー（Design原則: 13. コンストレイント）
-@app.middleware("http")
-async def add_security_headers(request: Request, call_next):
-    response = await call_next(request)
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-Frame-Options"] = "DENY"
-    response.headers["X-XSS-Protection"] = "1; mode=block"
-    response.headers["Content-Security-Policy"] = (
+SECURITY_HEADERS = {
+    "X-Content-Type-Options": "nosniff",
+    "X-Frame-Options": "DENY",
+    "X-XSS-Protection": "1; mode=block",
+    "Content-Security-Policy": (
         "default-src 'self'; "
         "script-src 'self' 'unsafe-inline'; "
         "style-src 'self' 'unsafe-inline';"
-    )
-    return response
+    ),
+}
+
+class SecurityHeadersMiddleware:
+    """
+    セキュリティヘッダー付与（純ASGIミドルウェア）
+    レスポンス開始時にヘッダーだけ書き換え、本体はそのまま流す
+    （BaseHTTPMiddlewareのようにZIPストリームをチャンクごとに中継しない）
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for key, value in SECURITY_HEADERS.items():
+                    headers[key] = value
+            await send(message)
+        
+        await self.app(scope, receive, send_with_headers)
+
+app.add_middleware(SecurityHeadersMiddleware)
 
 # API ルーター登録
 app.include_router(jobs.router, prefix="/api/v1", tags=["jobs"])
@@ -73,10 +102,9 @@ app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
 # ルートページ（Design原則: 61. 即座の喜びを与える）
 @app.get("/", response_class=HTMLResponse)
-async def root():
-    """投稿フォームページ"""
-    html_path = Path("app/static/index.html")
-    return HTMLResponse(content=html_path.read_text(encoding="utf-8"))
+async def root(request: Request):
+    """投稿フォームページ（起動時に読み込んだHTMLをそのまま返す）"""
+    return HTMLResponse(content=request.app.state.index_html)
 
 # ヘルスチェック
 @app.get("/health")
@@ -88,16 +116,34 @@ async def health_check():
         "disk_free_gb": get_disk_free_space()
     }
 
+# ディスク空き容量キャッシュ（監視の高頻度ポーリングで毎回statvfsしない）
+DISK_FREE_CACHE_TTL_SEC = 30.0
+_disk_free_cache: tuple[float, float] = (0.0, 0.0)  # (取得時刻, GB)
+
 def get_disk_free_space() -> float:
-    """ディスク空き容量（GB）"""
-    import shutil
-    stat = shutil.disk_usage(settings.DATA_DIR)
-    return stat.free / (1024**3)
+    """ディスク空き容量（GB、30秒キャッシュ）"""
+    global _disk_free_cache
+    now = time.monotonic()
+    fetched_at, free_gb = _disk_free_cache
+    
+    if fetched_at == 0.0 or now - fetched_at > DISK_FREE_CACHE_TTL_SEC:
+        stat = shutil.disk_usage(settings.DATA_DIR)
+        free_gb = stat.free / (1024**3)
+        _disk_free_cache = (now, free_gb)
+    
+    return free_gb
 
 # 起動時処理
 @app.on_event("startup")
 async def startup_event():
     logger.info("MultiLang Voice Lab starting...")
+    # トップページは起動時に一度だけ読む（Design原則: 14. プリコンピュテーション）
+    app.state.index_html = Path("app/static/index.html").read_bytes()
+    # スレッドプールのサイズを設定で揃える（既定はasyncioがCPU数+4、anyioが40）
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=settings.THREADPOOL_MAX_WORKERS, thread_name_prefix="talkdub")
+    )
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_MAX_WORKERS
     # ディスク容量チェック（Design原則: 15. エラーを回避する）
     free_gb = get_disk_free_space()
     if free_gb < 50:
@@ -106,3 +152,5 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("MultiLang Voice Lab shutting down...")
+    await close_resend_client()
+    await close_async_redis()
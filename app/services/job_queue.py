@@ -27,14 +27,17 @@ celery_app.conf.update(
 )
 
 
+# pipeline.tasks.process_job_task の登録名
+PROCESS_JOB_TASK_NAME = "pipeline.tasks.process_job_task"
+
+
 def enqueue_job(job_id: str) -> str:
     """
     ジョブをキューへ追加
     Returns: Celery task_id
     """
-    from pipeline.tasks import process_job_task
-    
-    result = process_job_task.delay(job_id)
+    # タスク名で送信（pipeline.tasks は循環importになるうえWeb側では不要）
+    result = celery_app.send_task(PROCESS_JOB_TASK_NAME, args=[job_id])
     logger.info(f"Job {job_id} enqueued with task_id={result.id}")
     return result.id
 
@@ -2,9 +2,10 @@
 メール通知サービス（完全非同期版）
 Design原則: 90. UIをロックしない
 """
-import resend
-import asyncio
+import html
+import httpx
 import logging
+from string import Template
 from typing import Optional
 
 from config.settings import settings
@@ -12,8 +13,98 @@ from app.services.pin_manager import pin_manager
 
 logger = logging.getLogger(__name__)
 
-# Resend API Key設定
-resend.api_key = settings.RESEND_API_KEY
+RESEND_API_URL = "https://api.resend.com/emails"
+
+# Resend APIクライアント（HTTP/2・keep-aliveの接続を同じイベントループ内の送信で共有、初回送信時に生成）
+_resend_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_resend_client() -> httpx.AsyncClient:
+    global _resend_client
+    if _resend_client is None:
+        _resend_client = httpx.AsyncClient(
+            http2=True,
+            headers={"Authorization": f"Bearer {settings.RESEND_API_KEY}"},
+            timeout=httpx.Timeout(10.0)
+        )
+    return _resend_client
+
+
+# Celeryワーカー用の同期クライアント（イベントループを持たないため別に持ち、プロセス終了まで接続を再利用）
+_resend_sync_client: Optional[httpx.Client] = None
+
+
+def _get_resend_sync_client() -> httpx.Client:
+    global _resend_sync_client
+    if _resend_sync_client is None:
+        _resend_sync_client = httpx.Client(
+            http2=True,
+            headers={"Authorization": f"Bearer {settings.RESEND_API_KEY}"},
+            timeout=httpx.Timeout(10.0)
+        )
+    return _resend_sync_client
+
+
+async def close_resend_client() -> None:
+    """Resendクライアントの接続プールを閉じる（アプリ終了時）"""
+    global _resend_client
+    if _resend_client is not None:
+        await _resend_client.aclose()
+        _resend_client = None
+
+
+async def _send_email(params: dict) -> dict:
+    """
+    Resend APIへ1通送信
+    Design原則: 90. UIをロックしない - 応答待ちの間イベントループを解放
+    """
+    response = await _get_resend_client().post(RESEND_API_URL, json=params)
+    response.raise_for_status()
+    return response.json()
+
+
+async def _deliver(kind: str, job_id: str, params: dict) -> bool:
+    """1通送信（Returns: 送信できたか）"""
+    try:
+        response = await _send_email(params)
+        logger.info(f"Job {kind} email sent: job_id={job_id}, resend_id={response['id']}")
+        return True
+        
+    except Exception as e:
+        logger.error(f"Failed to send job {kind} email: {e}")
+        return False
+
+
+def _deliver_sync(kind: str, job_id: str, params: dict) -> bool:
+    """1通送信（同期版、Celeryワーカー用）"""
+    try:
+        response = _get_resend_sync_client().post(RESEND_API_URL, json=params)
+        response.raise_for_status()
+        logger.info(f"Job {kind} email sent: job_id={job_id}, resend_id={response.json()['id']}")
+        return True
+        
+    except Exception as e:
+        logger.error(f"Failed to send job {kind} email: {e}")
+        return False
+
+
+def _completed_params(job_id: str, email: str, pin: str, download_url: str, expires_at: str) -> dict:
+    return {
+        "from": settings.EMAIL_FROM,
+        "to": [email],
+        "subject": "【TalkDub】処理が完了しました",
+        "html": render_job_completed_html(job_id, pin, download_url, expires_at)
+    }
+
+
+def _failed_params(job_id: str, email: str, error_message: str) -> dict:
+    return {
+        "from": settings.EMAIL_FROM,
+        "to": [email],
+        "subject": "【TalkDub】処理が失敗しました",
+        "html": render_job_failed_html(job_id, error_message)
+    }
+
 
 async def send_job_created_email(
     job_id: str, 
@@ -23,27 +114,14 @@ async def send_job_created_email(
     tgt_lang: str
 ) -> bool:
     """ジョブ作成通知メール送信（非同期）"""
-    pin = pin_manager.generate_pin(job_id)
+    pin = await pin_manager.generate_pin_async(job_id)
     
-    try:
-        # Resend APIは同期なので、別スレッドで実行
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(
-            None,
-            lambda: resend.Emails.send({
-                "from": settings.EMAIL_FROM,
-                "to": [email],
-                "subject": "【TalkDub】処理を開始しました",
-                "html": render_job_created_html(job_id, pin, video_url, src_lang, tgt_lang)
-            })
-        )
-        
-        logger.info(f"Job created email sent: job_id={job_id}, resend_id={response['id']}")
-        return True
-        
-    except Exception as e:
-        logger.error(f"Failed to send job created email: {e}")
-        return False
+    return await _deliver("created", job_id, {
+        "from": settings.EMAIL_FROM,
+        "to": [email],
+        "subject": "【TalkDub】処理を開始しました",
+        "html": render_job_created_html(job_id, pin, video_url, src_lang, tgt_lang)
+    })
 
 async def send_job_completed_email(
     job_id: str, 
@@ -52,27 +130,9 @@ async def send_job_completed_email(
     expires_at: str
 ) -> bool:
     """処理完了通知メール送信（非同期）"""
-    pin_data = pin_manager.redis.hgetall(f"talkdub:pin:{job_id}")
-    pin = pin_data.get("pin", "N/A")
+    pin = await pin_manager.get_pin_async(job_id) or "N/A"
     
-    try:
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(
-            None,
-            lambda: resend.Emails.send({
-                "from": settings.EMAIL_FROM,
-                "to": [email],
-                "subject": "【TalkDub】処理が完了しました",
-                "html": render_job_completed_html(job_id, pin, download_url, expires_at)
-            })
-        )
-        
-        logger.info(f"Job completed email sent: job_id={job_id}, resend_id={response['id']}")
-        return True
-        
-    except Exception as e:
-        logger.error(f"Failed to send job completed email: {e}")
-        return False
+    return await _deliver("completed", job_id, _completed_params(job_id, email, pin, download_url, expires_at))
 
 async def send_job_failed_email(
     job_id: str, 
@@ -80,45 +140,48 @@ async def send_job_failed_email(
     error_message: str
 ) -> bool:
     """処理失敗通知メール送信（非同期）"""
-    try:
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(
-            None,
-            lambda: resend.Emails.send({
-                "from": settings.EMAIL_FROM,
-                "to": [email],
-                "subject": "【TalkDub】処理が失敗しました",
-                "html": render_job_failed_html(job_id, error_message)
-            })
-        )
-        
-        logger.info(f"Job failed email sent: job_id={job_id}, resend_id={response['id']}")
-        return True
-        
-    except Exception as e:
-        logger.error(f"Failed to send job failed email: {e}")
-        return False
+    return await _deliver("failed", job_id, _failed_params(job_id, email, error_message))
 
-def render_job_created_html(job_id: str, pin: str, video_url: str, src_lang: str, tgt_lang: str) -> str:
-    """
-    ジョブ作成通知HTMLテンプレート
-    Design原則: 11. ユーザーの言葉を使う
-    """
-    return f"""
+def send_job_completed_email_sync(
+    job_id: str, 
+    email: str, 
+    download_url: str, 
+    expires_at: str
+) -> bool:
+    """処理完了通知メール送信（同期、Celeryワーカー用）"""
+    pin = pin_manager.get_pin(job_id) or "N/A"
+    
+    return _deliver_sync("completed", job_id, _completed_params(job_id, email, pin, download_url, expires_at))
+
+def send_job_failed_email_sync(
+    job_id: str, 
+    email: str, 
+    error_message: str
+) -> bool:
+    """処理失敗通知メール送信（同期、Celeryワーカー用）"""
+    return _deliver_sync("failed", job_id, _failed_params(job_id, email, error_message))
+
+# HTMLテンプレート（静的部分はインポート時に一度だけ構築）
+# 3通で共通のスタイル（ヘッダー色と強調ボックスだけ各テンプレートで定義）
+_SHARED_CSS = """\
+        body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif; line-height: 1.6; color: #1f2937; }
+        .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+        .content { background: #ffffff; padding: 30px; border: 1px solid #e5e7eb; }
+        .footer { text-align: center; color: #6b7280; font-size: 14px; margin-top: 20px; }
+"""
+
+_CREATED_TEMPLATE = Template("""
 <!DOCTYPE html>
 <html lang="ja">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <style>
-        body {{ font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif; line-height: 1.6; color: #1f2937; }}
-        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-        .header {{ background: #2563eb; color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }}
-        .content {{ background: #ffffff; padding: 30px; border: 1px solid #e5e7eb; }}
-        .pin-box {{ background: #f9fafb; border: 2px solid #2563eb; padding: 20px; text-align: center; margin: 20px 0; border-radius: 8px; }}
-        .pin-code {{ font-size: 32px; font-weight: bold; letter-spacing: 8px; color: #2563eb; }}
-        .button {{ display: inline-block; background: #2563eb; color: white; padding: 12px 24px; text-decoration: none; border-radius: 6px; margin: 10px 0; }}
-        .footer {{ text-align: center; color: #6b7280; font-size: 14px; margin-top: 20px; }}
+""" + _SHARED_CSS + """\
+        .header { background: #2563eb; color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }
+        .pin-box { background: #f9fafb; border: 2px solid #2563eb; padding: 20px; text-align: center; margin: 20px 0; border-radius: 8px; }
+        .pin-code { font-size: 32px; font-weight: bold; letter-spacing: 8px; color: #2563eb; }
+        .button { display: inline-block; background: #2563eb; color: white; padding: 12px 24px; text-decoration: none; border-radius: 6px; margin: 10px 0; }
     </style>
 </head>
 <body>
@@ -134,14 +197,14 @@ def render_job_created_html(job_id: str, pin: str, video_url: str, src_lang: str
             <p>以下のジョブを受け付けました：</p>
             
             <ul>
-                <li><strong>ジョブID:</strong> {job_id}</li>
-                <li><strong>動画URL:</strong> {video_url}</li>
-                <li><strong>言語:</strong> {src_lang} → {tgt_lang}</li>
+                <li><strong>ジョブID:</strong> ${job_id}</li>
+                <li><strong>動画URL:</strong> ${video_url}</li>
+                <li><strong>言語:</strong> ${src_lang} → ${tgt_lang}</li>
             </ul>
             
             <div class="pin-box">
                 <p><strong>ダウンロード用PINコード</strong></p>
-                <div class="pin-code">{pin}</div>
+                <div class="pin-code">${pin}</div>
                 <p style="margin-top:10px; font-size:14px; color:#6b7280;">
                     処理完了後、このPINコードを入力してダウンロードしてください<br>
                     有効期限: 72時間
@@ -152,7 +215,7 @@ def render_job_created_html(job_id: str, pin: str, video_url: str, src_lang: str
             
             <p>処理完了時に再度メールでお知らせします。</p>
             
-            <a href="https://talkdub.lab/status/{job_id}" class="button">ステータスを確認</a>
+            <a href="https://talkdub.lab/status/${job_id}" class="button">ステータスを確認</a>
         </div>
         
         <div class="footer">
@@ -162,24 +225,19 @@ def render_job_created_html(job_id: str, pin: str, video_url: str, src_lang: str
     </div>
 </body>
 </html>
-"""
+""")
 
 
-def render_job_completed_html(job_id: str, pin: str, download_url: str, expires_at: str) -> str:
-    """処理完了通知HTMLテンプレート"""
-    return f"""
+_COMPLETED_TEMPLATE = Template("""
 <!DOCTYPE html>
 <html lang="ja">
 <head>
     <meta charset="UTF-8">
     <style>
-        body {{ font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif; line-height: 1.6; color: #1f2937; }}
-        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-        .header {{ background: #16a34a; color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }}
-        .content {{ background: #ffffff; padding: 30px; border: 1px solid #e5e7eb; }}
-        .pin-reminder {{ background: #fef3c7; border-left: 4px solid #f59e0b; padding: 15px; margin: 20px 0; }}
-        .button {{ display: inline-block; background: #16a34a; color: white; padding: 12px 24px; text-decoration: none; border-radius: 6px; margin: 10px 0; }}
-        .footer {{ text-align: center; color: #6b7280; font-size: 14px; margin-top: 20px; }}
+""" + _SHARED_CSS + """\
+        .header { background: #16a34a; color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }
+        .pin-reminder { background: #fef3c7; border-left: 4px solid #f59e0b; padding: 15px; margin: 20px 0; }
+        .button { display: inline-block; background: #16a34a; color: white; padding: 12px 24px; text-decoration: none; border-radius: 6px; margin: 10px 0; }
     </style>
 </head>
 <body>
@@ -191,21 +249,21 @@ def render_job_completed_html(job_id: str, pin: str, download_url: str, expires_
         <div class="content">
             <h2>納品物の準備ができました</h2>
             
-            <p>ジョブID <strong>{job_id}</strong> の処理が完了しました。</p>
+            <p>ジョブID <strong>${job_id}</strong> の処理が完了しました。</p>
             
             <div class="pin-reminder">
-                <strong>📌 PINコード: {pin}</strong><br>
+                <strong>📌 PINコード: ${pin}</strong><br>
                 ダウンロード時に必要です
             </div>
             
             <p><strong>⚠️ 重要:</strong></p>
             <ul>
-                <li>納品物は <strong>{expires_at}</strong> まで保持されます</li>
+                <li>納品物は <strong>${expires_at}</strong> まで保持されます</li>
                 <li>期限後は自動削除されます（再生成不可）</li>
                 <li>ダウンロードは最大5回まで可能です</li>
             </ul>
             
-            <a href="{download_url}" class="button">今すぐダウンロード</a>
+            <a href="${download_url}" class="button">今すぐダウンロード</a>
             
             <p style="margin-top:30px; font-size:14px; color:#6b7280;">
                 納品物にはYouTube Studioへのアップロード手順書が含まれています
@@ -218,23 +276,18 @@ def render_job_completed_html(job_id: str, pin: str, download_url: str, expires_
     </div>
 </body>
 </html>
-"""
+""")
 
 
-def render_job_failed_html(job_id: str, error_message: str) -> str:
-    """処理失敗通知HTMLテンプレート"""
-    return f"""
+_FAILED_TEMPLATE = Template("""
 <!DOCTYPE html>
 <html lang="ja">
 <head>
     <meta charset="UTF-8">
     <style>
-        body {{ font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif; line-height: 1.6; color: #1f2937; }}
-        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-        .header {{ background: #dc2626; color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }}
-        .content {{ background: #ffffff; padding: 30px; border: 1px solid #e5e7eb; }}
-        .error-box {{ background: #fef2f2; border-left: 4px solid #dc2626; padding: 15px; margin: 20px 0; }}
-        .footer {{ text-align: center; color: #6b7280; font-size: 14px; margin-top: 20px; }}
+""" + _SHARED_CSS + """\
+        .header { background: #dc2626; color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }
+        .error-box { background: #fef2f2; border-left: 4px solid #dc2626; padding: 15px; margin: 20px 0; }
     </style>
 </head>
 <body>
@@ -246,11 +299,11 @@ def render_job_failed_html(job_id: str, error_message: str) -> str:
         <div class="content">
             <h2>処理中にエラーが発生しました</h2>
             
-            <p>ジョブID <strong>{job_id}</strong> の処理が失敗しました。</p>
+            <p>ジョブID <strong>${job_id}</strong> の処理が失敗しました。</p>
             
             <div class="error-box">
                 <strong>エラー内容:</strong><br>
-                {error_message}
+                ${error_message}
             </div>
             
             <p><strong>考えられる原因:</strong></p>
@@ -271,4 +324,44 @@ def render_job_failed_html(job_id: str, error_message: str) -> str:
     </div>
 </body>
 </html>
-"""
+""")
+
+
+def _render(template: Template, **values: str) -> str:
+    """全ての差し込み値をHTMLエスケープして展開（属性値の中でも安全なようにquote=True）"""
+    return template.substitute({key: html.escape(str(value)) for key, value in values.items()})
+
+
+def render_job_created_html(job_id: str, pin: str, video_url: str, src_lang: str, tgt_lang: str) -> str:
+    """
+    ジョブ作成通知HTMLテンプレート
+    Design原則: 11. ユーザーの言葉を使う
+    """
+    return _render(
+        _CREATED_TEMPLATE,
+        job_id=job_id,
+        pin=pin,
+        video_url=video_url,
+        src_lang=src_lang,
+        tgt_lang=tgt_lang
+    )
+
+
+def render_job_completed_html(job_id: str, pin: str, download_url: str, expires_at: str) -> str:
+    """処理完了通知HTMLテンプレート"""
+    return _render(
+        _COMPLETED_TEMPLATE,
+        job_id=job_id,
+        pin=pin,
+        download_url=download_url,
+        expires_at=expires_at
+    )
+
+
+def render_job_failed_html(job_id: str, error_message: str) -> str:
+    """処理失敗通知HTMLテンプレート"""
+    return _render(
+        _FAILED_TEMPLATE,
+        job_id=job_id,
+        error_message=error_message
+    )
@@ -2,43 +2,82 @@
 PIN管理（Redis永続化版）
 Design原則: 54. フェールセーフ - 再起動に耐える
 """
-import redis
 import secrets
 import logging
-from datetime import datetime, timedelta
+import time
+from itertools import islice
 from typing import Optional
 
 from config.settings import settings
+from app.services.redis_client import redis_client, async_redis_client
 
 logger = logging.getLogger(__name__)
 
+# cleanup_expiredで1パイプラインに載せるキー数
+CLEANUP_BATCH_SIZE = 500
+
 class PINManager:
     """PIN生成・検証管理（Redis永続化）"""
     
     def __init__(self):
-        self.redis = redis.from_url(
-            settings.CELERY_BROKER_URL,
-            decode_responses=True
-        )
+        self.redis = redis_client
+        # イベントループ上（API・通知）から使う非同期クライアント
+        self.aredis = async_redis_client
         self.prefix = "talkdub:pin:"
+        self.max_attempts = 5
     
-    def generate_pin(self, job_id: str) -> str:
+    def _new_pin(self) -> tuple[str, dict]:
         """
-        6桁PINコード生成
+        6桁PINコードと保存内容を生成
         Design原則: 13. コンストレイント - 6桁固定
         """
-        pin = ''.join([str(secrets.randbelow(10)) for _ in range(6)])
+        pin = f"{secrets.randbelow(1_000_000):06d}"
+        return pin, {
+            "pin": pin,
+            "attempts": "0",
+            "created_at_ts": str(int(time.time()))  # Unix秒（表示時のみISO化）
+        }
+    
+    def _judge(self, data: dict, attempts: int, pin: str) -> tuple[bool, str]:
+        """HGETALL/HINCRBYの結果からPIN検証結果を判定"""
+        if not data:
+            return False, "PINが見つかりません（有効期限切れの可能性があります）"
+        
+        # 試行回数チェック
+        if attempts > self.max_attempts:
+            return False, "試行回数上限に達しました"
+        
+        stored_pin = data.get("pin")
         
+        if stored_pin is not None and secrets.compare_digest(stored_pin, pin):
+            return True, ""
+        else:
+            remaining = self.max_attempts - attempts
+            return False, f"PINコードが正しくありません（残り{remaining}回）"
+    
+    def generate_pin(self, job_id: str) -> str:
+        """6桁PINコード生成"""
+        pin, fields = self._new_pin()
         key = f"{self.prefix}{job_id}"
-        expiry_seconds = settings.PIN_EXPIRY_HOURS * 3600
         
-        # Redis HSET + EXPIRE
-        self.redis.hset(key, mapping={
-            "pin": pin,
-            "attempts": "0",
-            "created_at": datetime.utcnow().isoformat()
-        })
-        self.redis.expire(key, expiry_seconds)
+        # Redis HSET + EXPIRE（MULTI/EXECで同時に適用し、TTLなしのキーを残さない）
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(key, mapping=fields)
+        pipe.expire(key, settings.PIN_EXPIRY_HOURS * 3600)
+        pipe.execute()
+        
+        logger.info(f"PIN generated for job {job_id}, expires in {settings.PIN_EXPIRY_HOURS}h")
+        return pin
+    
+    async def generate_pin_async(self, job_id: str) -> str:
+        """6桁PINコード生成（非同期版）"""
+        pin, fields = self._new_pin()
+        key = f"{self.prefix}{job_id}"
+        
+        async with self.aredis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=fields)
+            pipe.expire(key, settings.PIN_EXPIRY_HOURS * 3600)
+            await pipe.execute()
         
         logger.info(f"PIN generated for job {job_id}, expires in {settings.PIN_EXPIRY_HOURS}h")
         return pin
@@ -51,27 +90,50 @@ class PINManager:
         """
         key = f"{self.prefix}{job_id}"
         
-        if not self.redis.exists(key):
-            return False, "PINが見つかりません（有効期限切れの可能性があります）"
+        # PIN取得と試行回数の加算を1往復のMULTI/EXECで行う
+        # （加算はアトミックなのでワーカー間の競合でも上限をすり抜けない）
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hgetall(key)
+        pipe.hincrby(key, "attempts", 1)
+        data, attempts = pipe.execute()
         
-        data = self.redis.hgetall(key)
-        stored_pin = data.get("pin")
-        attempts = int(data.get("attempts", 0))
+        if not data:
+            # 期限切れ後のHINCRBYが作ったTTLなしのキーを残さない
+            self.redis.delete(key)
         
-        # 試行回数チェック
-        if attempts >= 5:
-            return False, "試行回数上限に達しました"
-        
-        # 試行回数を増やす
-        self.redis.hincrby(key, "attempts", 1)
-        
-        if stored_pin == pin:
+        is_valid, error_msg = self._judge(data, attempts, pin)
+        if is_valid:
             # 成功時は試行回数をリセット（再利用許可）
             self.redis.hset(key, "attempts", "0")
-            return True, ""
-        else:
-            remaining = 5 - (attempts + 1)
-            return False, f"PINコードが正しくありません（残り{remaining}回）"
+        return is_valid, error_msg
+    
+    async def verify_pin_async(self, job_id: str, pin: str) -> tuple[bool, str]:
+        """
+        PIN検証（非同期版、ダウンロードAPI用）
+        Design原則: 90. UIをロックしない - Redis応答待ちでイベントループを止めない
+        """
+        key = f"{self.prefix}{job_id}"
+        
+        async with self.aredis.pipeline(transaction=True) as pipe:
+            pipe.hgetall(key)
+            pipe.hincrby(key, "attempts", 1)
+            data, attempts = await pipe.execute()
+        
+        if not data:
+            await self.aredis.delete(key)
+        
+        is_valid, error_msg = self._judge(data, attempts, pin)
+        if is_valid:
+            await self.aredis.hset(key, "attempts", "0")
+        return is_valid, error_msg
+    
+    def get_pin(self, job_id: str) -> Optional[str]:
+        """発行済みPIN取得（完了通知メール用）"""
+        return self.redis.hget(f"{self.prefix}{job_id}", "pin")
+    
+    async def get_pin_async(self, job_id: str) -> Optional[str]:
+        """発行済みPIN取得（非同期版）"""
+        return await self.aredis.hget(f"{self.prefix}{job_id}", "pin")
     
     def delete_pin(self, job_id: str) -> None:
         """PIN削除（ジョブ削除時）"""
@@ -81,15 +143,23 @@ class PINManager:
     def cleanup_expired(self) -> int:
         """
         期限切れPINの削除（実際はRedisのEXPIREで自動削除）
-        この関数は監視用
+        この関数は監視用: generate_pinはTTL付きでしか書かないため、
+        ここで見つかるのは異常データのみ
         """
         pattern = f"{self.prefix}*"
+        keys = self.redis.scan_iter(match=pattern, count=1000)
         count = 0
         
-        for key in self.redis.scan_iter(match=pattern):
-            if self.redis.ttl(key) == -1:  # 期限が設定されていない異常データ
-                self.redis.delete(key)
-                count += 1
+        # TTL確認とDELをCLEANUP_BATCH_SIZE件ずつパイプラインでまとめる（キーごとの往復をなくす）
+        while batch := list(islice(keys, CLEANUP_BATCH_SIZE)):
+            pipe = self.redis.pipeline(transaction=False)
+            for key in batch:
+                pipe.ttl(key)
+            ttls = pipe.execute()
+            
+            orphans = [key for key, ttl in zip(batch, ttls) if ttl == -1]  # 期限が設定されていない異常データ
+            if orphans:
+                count += self.redis.delete(*orphans)
         
         return count
 
@@ -0,0 +1,31 @@
+"""
+Redis接続（プロセス内で1つの接続プールを共有）
+Design原則: 18. 複雑性をシステム側へ
+"""
+import redis
+import redis.asyncio
+
+from config.settings import settings
+
+# PIN・重複投稿インデックス・Groqレート制限・翻訳キャッシュで共有する
+pool = redis.ConnectionPool.from_url(
+    settings.REDIS_URL,
+    decode_responses=True,
+    max_connections=64
+)
+
+redis_client = redis.Redis(connection_pool=pool)
+
+# イベントループ用（接続はループに紐づくため同期プールとは別に持つ）
+async_pool = redis.asyncio.ConnectionPool.from_url(
+    settings.REDIS_URL,
+    decode_responses=True,
+    max_connections=64
+)
+
+async_redis_client = redis.asyncio.Redis(connection_pool=async_pool)
+
+
+async def close_async_redis() -> None:
+    """非同期プールの接続を閉じる（アプリ終了時）"""
+    await async_pool.disconnect()
@@ -2,17 +2,83 @@
 ファイルストレージ管理
 Design原則: 23. オブジェクトベースにする
 """
-import json
+import os
+import orjson
+import redis
 import shutil
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 from datetime import datetime
 import logging
 
 from config.settings import settings
+from app.services.redis_client import redis_client
 
 logger = logging.getLogger(__name__)
 
+# 重複投稿インデックス（video_id → job_id）
+_redis = redis_client
+VIDEO_INDEX_PREFIX = "talkdub:video:"
+
+# job.jsonの共有キャッシュ（Web/Workerプロセス間でディスク読み込みを省く）
+# キーにファイルの版（inode・mtime・サイズ）を含めるため、古い内容が新しい版として返ることはない
+# （無効化不要、古い版のキーはTTLで消える）
+# ステータス列はキャッシュせず、load_jobが毎回インデックスから重ねる
+JOB_CACHE_PREFIX = "talkdub:job:v2:"
+JOB_CACHE_TTL_SEC = 30
+# segments入りの大きなjob.jsonはRedisへ載せない（ページキャッシュからの読み込みの方が安い）
+JOB_CACHE_MAX_BYTES = 256 * 1024
+
+# ジョブ要約インデックス（SQLite）
+# job.json は segments を含み大きくなるため、ステータス確認はこちらを引く
+JOB_INDEX_PATH = settings.DATA_DIR / "jobs.sqlite3"
+_SUMMARY_COLUMNS = (
+    "job_id", "video_id", "status", "current_phase",
+    "created_at", "expires_at", "error", "progress",
+    "created_at_ts", "expires_at_ts"
+)
+_index_local = threading.local()
+
+# update_job_statusが差分更新する列と、job.jsonまで書き出す終了状態
+_STATUS_COLUMNS = ("status", "current_phase", "error")
+TERMINAL_STATUSES = frozenset({"COMPLETED", "FAILED", "EXPIRED"})
+# update_job_statusで「変更しない」列（Noneは値を消す指定）
+UNCHANGED: Any = object()
+
+# job.json の書式（整形出力、数値キーはjson.dumps同様に文字列化）
+JOB_JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
+@dataclass(frozen=True)
+class JobPaths:
+    """ジョブ1件分のファイル配置"""
+    job_json: Path
+    ref_dir: Path
+    output_dir: Path
+    temp_dir: Path
+    log_dir: Path
+
+
+@lru_cache(maxsize=1024)
+def paths_for(job_id: str) -> JobPaths:
+    """
+    job_idのファイル配置（ジョブごとに一度だけ組み立てる）
+    Design原則: 6. 一貫性 - 配置ルールをここに集約
+    """
+    return JobPaths(
+        job_json=settings.JOBS_DIR / f"{job_id}.json",
+        ref_dir=settings.REF_AUDIO_DIR / job_id,
+        output_dir=settings.OUTPUT_DIR / job_id,
+        temp_dir=settings.TEMP_DIR / job_id,
+        log_dir=settings.LOGS_DIR / job_id,
+    )
+
+
 class JobNotFoundError(Exception):
     """ジョブが見つからない"""
     pass
@@ -22,9 +88,158 @@ class JobStorageError(Exception):
     pass
 
 
+def _get_index() -> sqlite3.Connection:
+    """スレッドごとのSQLite接続（初回に表を作成）"""
+    conn = getattr(_index_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(JOB_INDEX_PATH, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                video_id TEXT,
+                status TEXT,
+                current_phase TEXT,
+                created_at TEXT,
+                expires_at TEXT,
+                error TEXT,
+                progress TEXT,
+                created_at_ts INTEGER,
+                expires_at_ts INTEGER
+            )"""
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_video_id ON jobs(video_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_expires_at_ts ON jobs(expires_at_ts)")
+        conn.commit()
+        _index_local.conn = conn
+    return conn
+
+
+def _index_job(job: dict) -> None:
+    """ジョブ要約をインデックスへ反映（save_jobから呼ぶ）"""
+    conn = _get_index()
+    conn.execute(
+        f"INSERT OR REPLACE INTO jobs ({', '.join(_SUMMARY_COLUMNS)}) "
+        f"VALUES ({', '.join('?' * len(_SUMMARY_COLUMNS))})",
+        (
+            job["job_id"],
+            job.get("source", {}).get("video_id"),
+            job.get("status"),
+            job.get("current_phase"),
+            job.get("created_at"),
+            job.get("expires_at"),
+            job.get("error"),
+            orjson.dumps(job.get("progress", {})).decode(),
+            job_timestamp(job, "created_at"),
+            job_timestamp(job, "expires_at"),
+        )
+    )
+    conn.commit()
+
+
+def job_timestamp(job: dict, field: str) -> Optional[int]:
+    """
+    job の {field}_ts（Unix秒）を取得
+    旧形式のジョブ（ISO文字列のみ）は文字列から算出する
+    """
+    ts = job.get(f"{field}_ts")
+    if ts is None and job.get(field):
+        ts = int(datetime.fromisoformat(job[field].replace("Z", "+00:00")).timestamp())
+    return ts
+
+
 def job_exists(job_id: str) -> bool:
     """ジョブの存在確認"""
-    return (settings.JOBS_DIR / f"{job_id}.json").exists()
+    return paths_for(job_id).job_json.exists()
+
+
+def get_job_summary(job_id: str) -> Optional[dict]:
+    """
+    ジョブ要約取得（ステータス確認用、job.jsonを読まない）
+    Returns: 要約dict、ジョブが無ければNone
+    """
+    row = _get_index().execute(
+        f"SELECT {', '.join(_SUMMARY_COLUMNS)} FROM jobs WHERE job_id = ?",
+        (job_id,)
+    ).fetchone()
+    
+    if row is None:
+        # インデックス導入前のジョブはjob.jsonから補完
+        if not job_exists(job_id):
+            return None
+        job = load_job(job_id)
+        _index_job(job)
+        return {key: job.get(key) for key in _SUMMARY_COLUMNS}
+    
+    summary = dict(zip(_SUMMARY_COLUMNS, row))
+    summary["progress"] = orjson.loads(summary["progress"] or "{}")
+    return summary
+
+
+def claim_video(video_id: str, job_id: str, hours: int = 24) -> Optional[str]:
+    """
+    video_idをjob_idで予約（SET NX EX）
+    Returns: 既に予約済みならそのjob_id、新規予約できたらNone
+    Design原則: 39. 整合性を損なう操作を求めない - 同時投稿でも1件だけ通す
+    """
+    key = f"{VIDEO_INDEX_PREFIX}{video_id}"
+    
+    while True:
+        if _redis.set(key, job_id, nx=True, ex=hours * 3600):
+            return None
+        
+        existing = _redis.get(key)
+        if existing is not None:
+            return existing
+        # SET NXとGETの間に期限切れになった場合は予約し直す
+
+
+def release_video(video_id: str, job_id: str) -> None:
+    """video_id予約の解除（ジョブ作成失敗時）"""
+    key = f"{VIDEO_INDEX_PREFIX}{video_id}"
+    if _redis.get(key) == job_id:
+        _redis.delete(key)
+
+
+def _job_cache_key(job_id: str, st: os.stat_result) -> str:
+    """job.jsonの版ごとのキャッシュキー（atomic writeのたびにinodeが変わる）"""
+    return f"{JOB_CACHE_PREFIX}{job_id}:{st.st_ino}:{st.st_mtime_ns}:{st.st_size}"
+
+
+def _cache_job(cache_key: str, data: bytes) -> None:
+    """job.jsonの内容を共有キャッシュへ（失敗してもディスクが正）"""
+    try:
+        _redis.set(cache_key, data, ex=JOB_CACHE_TTL_SEC)
+    except redis.RedisError as e:
+        logger.warning(f"Failed to cache {cache_key}: {e}")
+
+
+def _read_job_bytes(job_id: str) -> bytes:
+    """
+    job.jsonの内容を取得（小さいものは版付きキーで共有キャッシュを引く）
+    開いたファイルをfstatするため、版と内容が食い違わない
+    Raises: JobNotFoundError
+    """
+    try:
+        with open(paths_for(job_id).job_json, "rb") as f:
+            st = os.fstat(f.fileno())
+            if st.st_size > JOB_CACHE_MAX_BYTES:
+                return f.read()
+            
+            cache_key = _job_cache_key(job_id, st)
+            try:
+                data = _redis.get(cache_key)
+            except redis.RedisError as e:
+                logger.warning(f"Job cache unavailable, reading {job_id} from disk: {e}")
+                return f.read()
+            
+            if data is None:
+                data = f.read()
+                _cache_job(cache_key, data)
+            return data
+    except FileNotFoundError:
+        raise JobNotFoundError(f"Job {job_id} not found")
 
 
 def load_job(job_id: str) -> dict:
@@ -32,16 +247,23 @@ def load_job(job_id: str) -> dict:
     ジョブデータ読み込み
     Raises: JobNotFoundError
     """
-    job_path = settings.JOBS_DIR / f"{job_id}.json"
-    
-    if not job_path.exists():
-        raise JobNotFoundError(f"Job {job_id} not found")
+    data = _read_job_bytes(job_id)
     
     try:
-        return json.loads(job_path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError as e:
+        job = orjson.loads(data)
+    except orjson.JSONDecodeError as e:
         logger.error(f"Failed to parse job {job_id}: {e}")
         raise JobStorageError(f"Corrupted job file: {job_id}")
+    
+    # update_job_statusの差分（インデックス側が新しい）をそのまま重ねる（NULLは消去済み）
+    row = _get_index().execute(
+        f"SELECT {', '.join(_STATUS_COLUMNS)} FROM jobs WHERE job_id = ?",
+        (job_id,)
+    ).fetchone()
+    if row is not None:
+        job.update(zip(_STATUS_COLUMNS, row))
+    
+    return job
 
 
 def save_job(job: dict, atomic: bool = True) -> None:
@@ -50,23 +272,29 @@ def save_job(job: dict, atomic: bool = True) -> None:
     Design原則: 54. フェールセーフ - atomic writeで破損防止
     """
     job_id = job["job_id"]
-    job_path = settings.JOBS_DIR / f"{job_id}.json"
+    job_path = paths_for(job_id).job_json
     
     try:
+        data = orjson.dumps(job, option=JOB_JSON_OPTIONS)
         if atomic:
             # Design原則: 15. エラーを回避する（atomic write）
-            temp_path = job_path.with_suffix(".tmp")
-            temp_path.write_text(
-                json.dumps(job, indent=2, ensure_ascii=False),
-                encoding="utf-8"
+            # 一時ファイルは書き手ごとに分ける（Web/Workerの同時保存で混ざらない）
+            temp_path = job_path.with_name(
+                f"{job_id}.{os.getpid()}.{threading.get_ident()}.tmp"
             )
+            temp_path.write_bytes(data)
+            # 置き換え前に版を取る（置き換え後のstatは他の書き手の版を拾いうる）
+            st = temp_path.stat()
             temp_path.replace(job_path)  # atomic on POSIX
         else:
-            job_path.write_text(
-                json.dumps(job, indent=2, ensure_ascii=False),
-                encoding="utf-8"
-            )
-            
+            job_path.write_bytes(data)
+            st = None
+        
+        _index_job(job)
+        if st is not None and len(data) <= JOB_CACHE_MAX_BYTES:
+            # この版の内容は不変なので、そのまま書き込んでよい
+            _cache_job(_job_cache_key(job_id, st), data)
+        
         logger.debug(f"Job {job_id} saved successfully")
         
     except Exception as e:
@@ -77,22 +305,36 @@ def save_job(job: dict, atomic: bool = True) -> None:
 def update_job_status(
     job_id: str,
     status: str,
-    current_phase: Optional[str] = None,
-    error: Optional[str] = None
+    current_phase: Optional[str] = UNCHANGED,
+    error: Optional[str] = UNCHANGED
 ) -> None:
     """
     ジョブステータス更新（便利関数）
     Design原則: 18. 複雑性をシステム側へ
-    """
-    job = load_job(job_id)
-    job["status"] = status
     
-    if current_phase:
-        job["current_phase"] = current_phase
+    current_phase / error は省略すると現状のまま、Noneを渡すと消去する。
+    終了状態以外はインデックスの差分更新のみ。job.jsonへは次のsave_job
+    （load_jobが差分を重ねた内容）か終了状態への更新で書き出される。
+    """
+    changes = {"status": status}
+    if current_phase is not UNCHANGED:
+        changes["current_phase"] = current_phase
+    if error is not UNCHANGED:
+        changes["error"] = error
     
-    if error:
-        job["error"] = error
+    if status not in TERMINAL_STATUSES:
+        # 進行中の更新はインデックス行だけを書き換える（job.jsonは書き直さない）
+        conn = _get_index()
+        updated = conn.execute(
+            f"UPDATE jobs SET {', '.join(f'{key} = ?' for key in changes)} WHERE job_id = ?",
+            (*changes.values(), job_id)
+        ).rowcount
+        conn.commit()
+        if updated:
+            return
     
+    job = load_job(job_id)
+    job.update(changes)
     save_job(job)
 
 
@@ -102,31 +344,26 @@ def delete_job(job_id: str, keep_logs: bool = True) -> None:
     Design原則: 54. フェールセーフ - ログは保持
     """
     try:
-        # job.json
-        job_path = settings.JOBS_DIR / f"{job_id}.json"
-        if job_path.exists():
-            job_path.unlink()
-        
-        # ref_audio
-        ref_dir = settings.REF_AUDIO_DIR / job_id
-        if ref_dir.exists():
-            shutil.rmtree(ref_dir)
+        paths = paths_for(job_id)
         
-        # output
-        output_dir = settings.OUTPUT_DIR / job_id
-        if output_dir.exists():
-            shutil.rmtree(output_dir)
+        # job.json
+        if paths.job_json.exists():
+            paths.job_json.unlink()
         
-        # temp
-        temp_dir = settings.TEMP_DIR / job_id
-        if temp_dir.exists():
-            shutil.rmtree(temp_dir)
+        conn = _get_index()
+        conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+        conn.commit()
         
-        # logs（keep_logsがFalseの時だけ削除）
+        # ref_audio / output / temp / logs（logsはkeep_logsがFalseの時だけ削除）
+        job_dirs = [paths.ref_dir, paths.output_dir, paths.temp_dir]
         if not keep_logs:
-            log_dir = settings.LOGS_DIR / job_id
-            if log_dir.exists():
-                shutil.rmtree(log_dir)
+            job_dirs.append(paths.log_dir)
+        job_dirs = [d for d in job_dirs if d.exists()]
+        
+        # ディレクトリごとにスレッドを分けて並行削除（unlinkの待ちを重ねる）
+        if job_dirs:
+            with ThreadPoolExecutor(max_workers=len(job_dirs)) as pool:
+                list(pool.map(shutil.rmtree, job_dirs))
         
         logger.info(f"Job {job_id} deleted successfully (keep_logs={keep_logs})")
         
@@ -140,21 +377,33 @@ def get_expired_jobs() -> list[str]:
     期限切れジョブのリストを取得
     Design原則: 29. 唯一の選択は自動化する
     """
-    expired = []
-    now = datetime.utcnow()
+    conn = _get_index()
     
+    # インデックス導入前のジョブ（job.jsonのみ）は初回に取り込む
+    indexed = {row[0] for row in conn.execute("SELECT job_id FROM jobs")}
     for job_file in settings.JOBS_DIR.glob("*.json"):
+        if job_file.stem in indexed:
+            continue
         try:
-            job = json.loads(job_file.read_text())
-            
-            if job.get("expires_at"):
-                expires = datetime.fromisoformat(job["expires_at"].replace("Z", "+00:00"))
-                if now > expires:
-                    expired.append(job["job_id"])
-                    
+            _index_job(load_job(job_file.stem))
         except Exception as e:
             logger.warning(f"Failed to check expiry for {job_file.name}: {e}")
     
+    now = time.time()
+    expired = [
+        row[0] for row in conn.execute(
+            "SELECT job_id FROM jobs WHERE expires_at_ts < ?", (now,)
+        )
+    ]
+    
+    # Unix秒導入前に索引された行はISO文字列から判定
+    for job_id, expires_at in conn.execute(
+        "SELECT job_id, expires_at FROM jobs "
+        "WHERE expires_at_ts IS NULL AND expires_at IS NOT NULL"
+    ):
+        if now > job_timestamp({"expires_at": expires_at}, "expires_at"):
+            expired.append(job_id)
+    
     return expired
 
 
@@ -164,14 +413,16 @@ def cleanup_temp_files(hours: int = 48) -> int:
     Returns: 削除したディレクトリ数
     """
     count = 0
-    cutoff = datetime.utcnow().timestamp() - (hours * 3600)
+    cutoff = time.time() - (hours * 3600)
     
-    for temp_dir in settings.TEMP_DIR.iterdir():
-        if temp_dir.is_dir() and temp_dir.stat().st_mtime < cutoff:
-            try:
-                shutil.rmtree(temp_dir)
-                count += 1
-            except Exception as e:
-                logger.warning(f"Failed to delete temp dir {temp_dir}: {e}")
+    # scandirはd_typeを返すため、ディレクトリ判定にstatが要らない
+    with os.scandir(settings.TEMP_DIR) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False) and entry.stat(follow_symlinks=False).st_mtime < cutoff:
+                try:
+                    shutil.rmtree(entry.path)
+                    count += 1
+                except Exception as e:
+                    logger.warning(f"Failed to delete temp dir {entry.path}: {e}")
     
     return count
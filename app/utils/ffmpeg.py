@@ -2,6 +2,9 @@
 ffmpeg/ffprobe ラッパー
 Design原則: 18. 複雑性をシステム側へ
 """
+import asyncio
+import os
+import av
 import subprocess
 import json
 import logging
@@ -12,7 +15,20 @@ logger = logging.getLogger(__name__)
 def get_audio_duration(audio_path: Path) -> float:
     """
     音声ファイルの長さ（秒）を取得
+    libav（PyAV）でコンテナを直接開き、読めない場合だけffprobeを起動する
     """
+    try:
+        with av.open(str(audio_path)) as container:
+            if container.duration is not None:
+                return container.duration / av.time_base
+    except av.error.FFmpegError as e:
+        logger.debug(f"PyAV could not probe {audio_path}, falling back to ffprobe: {e}")
+    
+    return _probe_duration(audio_path)
+
+
+def _probe_duration(audio_path: Path) -> float:
+    """ffprobeで長さ（秒）を取得（get_audio_durationのフォールバック）"""
     try:
         cmd = [
             "ffprobe",
@@ -37,6 +53,62 @@ def get_audio_duration(audio_path: Path) -> float:
         raise
 
 
+def _convert_cmd(
+    input_path: Path,
+    output_path: Path,
+    sample_rate: int,
+    channels: int,
+    codec: str
+) -> list[str]:
+    return [
+        "ffmpeg", "-i", str(input_path),
+        "-ar", str(sample_rate),
+        "-ac", str(channels),
+        "-c:a", codec,
+        "-y",
+        str(output_path)
+    ]
+
+
+def _segment_cmd(
+    input_path: Path,
+    output_path: Path,
+    start_sec: float,
+    duration_sec: float
+) -> list[str]:
+    # -ssを-iより前に置く（入力シーク: 先頭からデマックスせずに開始位置へ飛ぶ）
+    return [
+        "ffmpeg",
+        "-ss", str(start_sec),
+        "-i", str(input_path),
+        "-t", str(duration_sec),
+        "-c", "copy",
+        "-y",
+        str(output_path)
+    ]
+
+
+async def _run_ffmpeg_async(cmd: list[str], timeout: float) -> None:
+    """
+    ffmpegを非同期サブプロセスで実行
+    Design原則: 90. UIをロックしない - 待機中もイベントループを止めない
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        _, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+    
+    if proc.returncode != 0:
+        raise RuntimeError(stderr.decode(errors="replace"))
+
+
 def convert_audio(
     input_path: Path,
     output_path: Path,
@@ -48,14 +120,7 @@ def convert_audio(
     音声フォーマット変換
     """
     try:
-        cmd = [
-            "ffmpeg", "-i", str(input_path),
-            "-ar", str(sample_rate),
-            "-ac", str(channels),
-            "-c:a", codec,
-            "-y",
-            str(output_path)
-        ]
+        cmd = _convert_cmd(input_path, output_path, sample_rate, channels, codec)
         
         result = subprocess.run(cmd, capture_output=True, text=True, timeout=3600)
         
@@ -70,6 +135,28 @@ def convert_audio(
         raise
 
 
+async def convert_audio_async(
+    input_path: Path,
+    output_path: Path,
+    sample_rate: int = 16000,
+    channels: int = 1,
+    codec: str = "pcm_s16le"
+) -> None:
+    """
+    音声フォーマット変換（非同期版）
+    """
+    try:
+        cmd = _convert_cmd(input_path, output_path, sample_rate, channels, codec)
+        await _run_ffmpeg_async(cmd, timeout=3600)
+        
+        if not output_path.exists():
+            raise FileNotFoundError("Converted audio not created")
+        
+    except Exception as e:
+        logger.error(f"Failed to convert {input_path}: {e}")
+        raise
+
+
 def extract_audio_segment(
     input_path: Path,
     output_path: Path,
@@ -81,14 +168,7 @@ def extract_audio_segment(
     Design原則: 8. 直接操作 - 正確なタイムスタンプ
     """
     try:
-        cmd = [
-            "ffmpeg", "-i", str(input_path),
-            "-ss", str(start_sec),
-            "-t", str(duration_sec),
-            "-c", "copy",
-            "-y",
-            str(output_path)
-        ]
+        cmd = _segment_cmd(input_path, output_path, start_sec, duration_sec)
         
         result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
         
@@ -98,3 +178,45 @@ def extract_audio_segment(
     except Exception as e:
         logger.error(f"Failed to extract segment: {e}")
         raise
+
+
+async def extract_audio_segment_async(
+    input_path: Path,
+    output_path: Path,
+    start_sec: float,
+    duration_sec: float
+) -> None:
+    """
+    音声の一部を切り出し（非同期版）
+    """
+    try:
+        cmd = _segment_cmd(input_path, output_path, start_sec, duration_sec)
+        await _run_ffmpeg_async(cmd, timeout=300)
+        
+    except Exception as e:
+        logger.error(f"Failed to extract segment {output_path.name}: {e}")
+        raise
+
+
+def extract_audio_segments(
+    input_path: Path,
+    segments: list[tuple[Path, float, float]]
+) -> None:
+    """
+    複数区間をまとめて切り出し（ffmpegを並行起動、全て終わるまで待つ）
+    segments: [(出力パス, 開始秒, 長さ秒), ...]
+    同時に起動するffmpegはCPUコア数まで
+    """
+    async def _extract_all() -> None:
+        limit = asyncio.Semaphore(os.cpu_count() or 1)
+        
+        async def _extract(output_path: Path, start_sec: float, duration_sec: float) -> None:
+            async with limit:
+                await extract_audio_segment_async(input_path, output_path, start_sec, duration_sec)
+        
+        await asyncio.gather(*(
+            _extract(output_path, start_sec, duration_sec)
+            for output_path, start_sec, duration_sec in segments
+        ))
+    
+    asyncio.run(_extract_all())
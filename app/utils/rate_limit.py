@@ -0,0 +1,15 @@
+"""
+レート制限（全ワーカー共有）
+Design原則: 15. エラーを回避する
+"""
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+
+from config.settings import settings
+
+# Redisにカウンタを置き、uvicornワーカー間・再起動後も制限を共有する
+limiter = Limiter(
+    key_func=get_remote_address,
+    storage_uri=settings.REDIS_URL,
+    strategy="moving-window"
+)
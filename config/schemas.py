@@ -3,6 +3,23 @@ JSON Schema定義（Groq Structured Outputs対応）
 Design原則: 6. 一貫性 - 構造のルールを統一
 """
 
+# job.jsonの書式の版
+# 0.1: segments[].whisper.words は単語ごとのdictのリスト
+# 0.2: segments[].whisper.words は列ごとの配列（WHISPER_WORDS_SCHEMA、Pre-3が書き出す）
+JOB_SCHEMA_VERSION = "0.2"
+
+WHISPER_WORDS_SCHEMA = {
+    "type": "object",
+    "additionalProperties": False,
+    "required": ["text", "start", "end", "score"],
+    "properties": {
+        "text": {"type": "array", "items": {"type": "string"}},
+        "start": {"type": "array", "items": {"type": ["number", "null"]}},
+        "end": {"type": "array", "items": {"type": ["number", "null"]}},
+        "score": {"type": "array", "items": {"type": ["number", "null"]}}
+    }
+}
+
 JOB_SCHEMA = {
     "$schema": "https://json-schema.org/draft/2020-12/schema",
     "type": "object",
@@ -13,9 +30,10 @@ JOB_SCHEMA = {
         "segments", "outputs", "status"
     ],
     "properties": {
-        "schema_version": {"type": "string", "const": "0.1"},
+        "schema_version": {"type": "string", "enum": ["0.1", JOB_SCHEMA_VERSION]},
         "job_id": {"type": "string", "minLength": 8},
         "created_at": {"type": "string"},
+        "created_at_ts": {"type": "integer"},
         "status": {
             "type": "string",
             "enum": ["QUEUED", "PROCESSING", "COMPLETED", "FAILED", "PAUSED", "EXPIRED"]
@@ -73,12 +91,27 @@ JOB_SCHEMA = {
                 "max_overlap_ratio": {"type": "number"},
                 "overlap_duck_db": {"type": "number"},
                 "hallucination_policy": {"type": "string"},
+                "force_demucs": {"type": "boolean"},
                 "timeline_reference": {"type": "string"}
             }
         },
         
         "speakers": {"type": "array"},
-        "segments": {"type": "array"},
+        "segments": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "whisper": {
+                        "type": "object",
+                        "properties": {
+                            # 0.1のジョブは単語dictのリスト
+                            "words": {"oneOf": [{"type": "array"}, WHISPER_WORDS_SCHEMA]}
+                        }
+                    }
+                }
+            }
+        },
         "outputs": {
             "type": "object",
             "additionalProperties": False,
@@ -103,7 +136,8 @@ JOB_SCHEMA = {
         
         "user_email": {"type": "string"},
         "download_count": {"type": "integer"},
-        "expires_at": {"type": ["string", "null"]}
+        "expires_at": {"type": ["string", "null"]},
+        "expires_at_ts": {"type": ["integer", "null"]}
     }
 }
 
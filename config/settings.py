@@ -2,6 +2,8 @@
 設定管理 v0.1.4 - Groq API詳細設定追加
 """
 import os
+import re
+from functools import lru_cache
 from pathlib import Path
 from pydantic_settings import BaseSettings
 from typing import Literal
@@ -37,7 +39,6 @@ class Settings(BaseSettings):
     
     # 外部API
     HF_TOKEN: str = os.getenv("HF_TOKEN", "")
-    GROQ_API_KEY: str = os.getenv("GROQ_API_KEY", "")
     RESEND_API_KEY: str = os.getenv("RESEND_API_KEY", "")
     
     # メール設定
@@ -64,10 +65,27 @@ class Settings(BaseSettings):
     TIMEOUT_SEPARATE: int = 7200  # 2時間 (Demucs重い)
     TIMEOUT_WHISPERX: int = 10800  # 3時間
     TIMEOUT_VAD: int = 1800
-    TIMEOUT_TTS_PER_SEGMENT: int = 300  # 5分/セグメント
     TIMEOUT_FFMPEG_BASIC: int = 300
     TIMEOUT_FFMPEG_COMPLEX: int = 3600
     
+    # Demucs実行デバイス（auto: CUDAがあればGPU、なければCPU / cpu / cuda）
+    DEMUCS_DEVICE: str = os.getenv("DEMUCS_DEVICE", "auto")
+    
+    # BGMの乏しい音声でDemucsを省略する閾値（4-8kHz帯/80Hz-4kHz帯のエネルギー比がこれ未満なら省略、0で無効）
+    DEMUCS_SKIP_RATIO: float = float(os.getenv("DEMUCS_SKIP_RATIO", "0"))
+    
+    # VADの並行数（長い音声をこの数までのチャンクに分けて同時に処理）
+    VAD_WORKERS: int = int(os.getenv("VAD_WORKERS", str(os.cpu_count() or 1)))
+    
+    # WhisperX（CPU推論：CTranslate2のint8量子化、スレッド数はCPUコア数）
+    WHISPERX_COMPUTE_TYPE: str = os.getenv("WHISPERX_COMPUTE_TYPE", "int8")
+    WHISPERX_CPU_THREADS: int = int(os.getenv("WHISPERX_CPU_THREADS", str(os.cpu_count() or 4)))
+    # ASR・アライメント・話者分離モデルをジョブ間で保持する（メモリに余裕のあるワーカーのみ1に）
+    WHISPERX_KEEP_MODELS: bool = os.getenv("WHISPERX_KEEP_MODELS", "0") == "1"
+    
+    # ダウンロード並列度（DASH断片の同時取得数・aria2cの接続数）
+    YTDLP_CONCURRENT_FRAGMENTS: int = 16
+    
     # Phase Retry Settings
     PHASE_MAX_RETRIES: int = 3
     PHASE_RETRY_DELAY_SEC: float = 5.0
@@ -78,9 +96,7 @@ class Settings(BaseSettings):
     MAX_OVERLAP_RATIO: float = 0.25
     OVERLAP_DUCK_DB: float = -6.0
     
-    # チャンク設定（翻訳）
-    CHUNK_CHAR_LIMIT_SRC: int = 2500
-    CHUNK_SEG_LIMIT: int = 40
+    # 翻訳リトライ（チャンク分割設定は下の「チャンク分割設定」）
     MAX_RETRIES: int = 5
     BACKOFF_BASE_SEC: float = 2.0
     
@@ -94,6 +110,12 @@ class Settings(BaseSettings):
     CELERY_BROKER_URL: str = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
     CELERY_RESULT_BACKEND: str = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/0")
     
+    # Redis（レート制限カウンタ等、全ワーカーで共有）
+    REDIS_URL: str = os.getenv("REDIS_URL", os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0"))
+    
+    # Webプロセスのスレッドプール（to_thread・同期イテレータのストリーミング）
+    THREADPOOL_MAX_WORKERS: int = int(os.getenv("THREADPOOL_MAX_WORKERS", "64"))
+    
     # Cloudflared Tunnel（追加仕様）
     CLOUDFLARED_ENABLED: bool = os.getenv("CLOUDFLARED_ENABLED", "false").lower() == "true"
     CLOUDFLARED_TUNNEL_ID: str = os.getenv("CLOUDFLARED_TUNNEL_ID", "")
@@ -130,7 +152,7 @@ IMPORTANT RULES:
     TRANSLATION_MIN_LENGTH_RATIO: float = 0.1  # 元の10%未満は異常
     TRANSLATION_MAX_LENGTH_RATIO: float = 5.0  # 元の5倍超は異常
     TRANSLATION_SUSPICIOUS_PATTERNS: list[str] = [
-        r'\\[.*?\\]',  # 未翻訳の記号（[laugh]等）が残っている
+        r'\[.*?\]',  # 未翻訳の記号（[laugh]等）が残っている
         r'[\u4e00-\u9fff]',  # 日本語→英語翻訳で漢字が残る
         r'[\u3040-\u309f\u30a0-\u30ff]',  # 日本語→英語翻訳でひらがな・カタカナが残る
     ]
@@ -167,6 +189,25 @@ IMPORTANT RULES:
             self.TEMP_DIR,
             self.LOGS_DIR,
         ]:
-            directory.mkdir(parents=True, exist_ok=True)
+            if not directory.is_dir():  # 既存なら mkdir(2) を発行しない
+                directory.mkdir(parents=True, exist_ok=True)
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    プロセス内で唯一のSettings（環境変数・.envの読み込みと検証は一度だけ）
+    FastAPIのDependsからもこの関数を使う
+    """
+    return Settings()
+
+settings = get_settings()
+
+# 頻繁に参照する値はプロセス起動時に一度だけ束縛する（Design原則: 14. プリコンピュテーション）
+# 対応言語の判定はメンバーシップのみなのでfrozenset、エラーメッセージ用の一覧も前計算
+SUPPORTED_LANGUAGE_CODES: frozenset[str] = frozenset(settings.SUPPORTED_LANGUAGES)
+SUPPORTED_LANGUAGES_TEXT: str = ", ".join(settings.SUPPORTED_LANGUAGES)
 
-settings = Settings()
+# 翻訳の不審パターンはセグメントごとに使うため一度だけコンパイル
+TRANSLATION_SUSPICIOUS_RES: tuple[re.Pattern, ...] = tuple(
+    re.compile(pattern) for pattern in settings.TRANSLATION_SUSPICIOUS_PATTERNS
+)
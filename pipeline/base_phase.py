@@ -2,11 +2,18 @@
 Phase基底クラス v2（リファクタ版）
 """
 import logging
+import orjson
+import os
+import signal
+import subprocess
+import tempfile
+import threading
 import time
+import uuid
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Any
+from typing import Mapping, Optional, Any
 from contextlib import contextmanager
 
 from app.services.storage import load_job, save_job
@@ -15,12 +22,21 @@ from pipeline.utils.logging_helper import StructuredLogger
 from pipeline.utils.error_translator import ErrorTranslator
 from config.settings import settings
 
-@dataclass
+# ワーカー停止要求（セット後はリトライ待機を打ち切る、tasks.pyのシグナルでセット）
+shutdown_requested = threading.Event()
+
+# 外部コマンド失敗時にエラーへ含めるログ末尾の長さ
+COMMAND_LOG_TAIL_BYTES = 8192
+
+# 並行実行するPhase同士のjob.json読み込み→マージ→保存を直列化する
+_JOB_METADATA_LOCK = threading.Lock()
+
+@dataclass(slots=True)
 class PhaseResult:
     """Phase処理結果"""
     success: bool
     output_files: dict[str, Path]
-    meta dict[str, Any]
+    metadata: dict[str, Any]
     error: Optional[str] = None
     user_friendly_error: Optional[str] = None  # 追加
     duration_sec: float = 0.0
@@ -37,9 +53,24 @@ class BasePhase(ABC):
         self.temp_dir = settings.TEMP_DIR / job_id
         self.temp_dir.mkdir(parents=True, exist_ok=True)
         
+        # run()中のjob.json（事前検証・validate_inputs・executeで共有）
+        self._job_cache: Optional[dict] = None
+        
+        # run()中の作業用ディレクトリ（temporary_file用、初回使用時に作成）
+        self._scratch: Optional[tempfile.TemporaryDirectory] = None
+        
         # 構造化ログ
         self.logger = StructuredLogger(job_id, self.get_phase_name())
     
+    def _get_job(self) -> dict:
+        """
+        job.jsonを取得（run()の間は一度だけ読み込む）
+        Design原則: 14. プリコンピュテーション
+        """
+        if self._job_cache is None:
+            self._job_cache = load_job(self.job_id)
+        return self._job_cache
+    
     @abstractmethod
     def get_phase_name(self) -> str:
         """Phase名"""
@@ -60,22 +91,43 @@ class BasePhase(ABC):
         """Phase処理本体"""
         pass
     
-    def run(self, max_retries: int = None) -> PhaseResult:
+    def run(
+        self,
+        max_retries: int = None,
+        job: Optional[dict] = None,
+        env: Optional[Mapping[str, str]] = None
+    ) -> PhaseResult:
         """
         Phase実行（事前検証 + リトライ + エラー翻訳）
+        job: 読み込み済みのjob.json（並行グループでは開始前のスナップショットを渡す）
+        env: 環境変数のスナップショット（省略時はos.environ）
         """
+        try:
+            return self._run(max_retries, job, env)
+        finally:
+            self._cleanup_scratch()
+    
+    def _run(
+        self,
+        max_retries: Optional[int],
+        job: Optional[dict],
+        env: Optional[Mapping[str, str]]
+    ) -> PhaseResult:
+        """run()本体（作業用ディレクトリの後始末はrun()側）"""
         max_retries = max_retries or settings.PHASE_MAX_RETRIES
         start_time = time.time()
         
         self.logger.info(f"Starting {self.get_phase_name()}")
         
         # 事前検証（Design原則: 32. 前提条件は先に提示する）
-        job = load_job(self.job_id)
+        self._job_cache = job  # 前回のrun()の内容を持ち越さない
+        job = self._get_job()
         is_valid, error_msg = validate_phase_preconditions(
             self.get_phase_id(),
             self.job_id,
             job,
-            self.temp_dir
+            self.temp_dir,
+            env=env
         )
         
         if not is_valid:
@@ -118,7 +170,10 @@ class BasePhase(ABC):
                 if attempt < max_retries - 1:
                     delay = settings.PHASE_RETRY_DELAY_SEC * (2 ** attempt)
                     self.logger.info(f"Retrying in {delay}s")
-                    time.sleep(delay)
+                    # 停止要求が来たら待機を打ち切り、残りのリトライもしない
+                    if shutdown_requested.wait(delay):
+                        self.logger.warning("Worker shutting down, abandoning retries")
+                        break
         
         # 全リトライ失敗
         technical_error = str(last_error)
@@ -141,26 +196,75 @@ class BasePhase(ABC):
     
     def _update_job_metadata(self, result: PhaseResult) -> None:
         """job.jsonにメタデータを反映"""
-        if not result.meta
+        if not result.metadata:
             return
         
-        job = load_job(self.job_id)
-        
-        for key, value in result.metadata.items():
-            if isinstance(value, dict) and key in job and isinstance(job[key], dict):
-                job[key].update(value)
-            else:
-                job[key] = value
+        with _JOB_METADATA_LOCK:
+            job = load_job(self.job_id)
+            before = orjson.dumps(job, option=orjson.OPT_NON_STR_KEYS)
+            
+            for key, value in result.metadata.items():
+                if isinstance(value, dict) and key in job and isinstance(job[key], dict):
+                    job[key].update(value)
+                else:
+                    job[key] = value
+            
+            # 再実行などで内容が変わらなければ書き直さない
+            if orjson.dumps(job, option=orjson.OPT_NON_STR_KEYS) == before:
+                self.logger.debug("Job metadata unchanged, skipping save")
+                return
+            
+            save_job(job)
+            self._job_cache = None
+    
+    def run_command(self, cmd: list[str], log_name: str, error_label: str) -> str:
+        """
+        長時間の外部コマンド実行（出力はメモリに溜めずtemp_dirのログファイルへ）
+        Returns: ログ末尾（COMMAND_LOG_TAIL_BYTESまで、stdout/stderr混在）
+        Raises: PhaseError（ログ末尾を含む）, subprocess.TimeoutExpired（プロセスグループ終了後）
+        """
+        log_path = self.temp_dir / log_name
         
-        save_job(job)
+        with log_path.open("w+b") as log:
+            # 独立したプロセスグループで起動し、タイムアウト時は孫プロセスごと終了させる
+            proc = subprocess.Popen(
+                cmd,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                start_new_session=True
+            )
+            try:
+                returncode = proc.wait(timeout=self.get_timeout())
+            except subprocess.TimeoutExpired:
+                self.logger.error(f"{cmd[0]} timed out, killing process group {proc.pid}")
+                try:
+                    os.killpg(proc.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                proc.wait()  # ゾンビを残さない
+                raise
+            
+            size = log.seek(0, os.SEEK_END)
+            log.seek(max(size - COMMAND_LOG_TAIL_BYTES, 0))
+            tail = log.read().decode("utf-8", errors="replace")
+            if returncode != 0:
+                raise PhaseError(f"{error_label}: {tail}")
+            return tail
     
     @contextmanager
     def temporary_file(self, suffix: str = ".tmp"):
-        """一時ファイルのコンテキストマネージャ"""
-        temp_path = self.temp_dir / f"{self.get_phase_name().replace(':', '_')}_{suffix}"
-        try:
-            yield temp_path
-        finally:
-            if temp_path.exists():
-                temp_path.unlink()
-                self.logger.debug(f"Cleaned up temporary file: {temp_path.name}")
+        """
+        一時ファイルのコンテキストマネージャ
+        ファイルはrun()の作業用ディレクトリに置き、run()終了時にまとめて削除する
+        """
+        if self._scratch is None:
+            prefix = self.get_phase_name().replace(':', '_').replace(' ', '') + "_"
+            self._scratch = tempfile.TemporaryDirectory(prefix=prefix, dir=self.temp_dir)
+        yield Path(self._scratch.name) / f"{uuid.uuid4().hex}{suffix}"
+    
+    def _cleanup_scratch(self) -> None:
+        """作業用ディレクトリを一括削除"""
+        if self._scratch is not None:
+            self._scratch.cleanup()
+            self._scratch = None
+            self.logger.debug("Cleaned up temporary files")
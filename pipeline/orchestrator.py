@@ -2,19 +2,25 @@
 パイプライン統合オーケストレーター
 Design原則: 23. オブジェクトベース - 対象中心に組む
 """
+import copy
 import logging
-from typing import List, Type
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Type, Union
 from dataclasses import dataclass
 
 from pipeline.base_phase import BasePhase, PhaseResult, PhaseError
-from app.services.storage import update_job_status
+from app.services.storage import load_job, update_job_status
 
 logger = logging.getLogger(__name__)
 
+# 互いの成果物を読まないPhaseの組（タプル）は同時に実行できる
+PhaseStep = Union[Type[BasePhase], tuple[Type[BasePhase], ...]]
+
 @dataclass
 class PipelineConfig:
     """パイプライン設定"""
-    phases: List[Type[BasePhase]]
+    phases: List[PhaseStep]
     stop_on_error: bool = True
 
 class PipelineOrchestrator:
@@ -27,54 +33,94 @@ class PipelineOrchestrator:
         self.job_id = job_id
         self.config = config
         self.logger = logging.getLogger(f"Pipeline.{job_id}")
+        # 前提条件検証用の環境変数（実行中に変わらないので開始時に一度だけ取る）
+        self._env_snapshot = {k: v for k, v in os.environ.items() if v}
     
     def run(self) -> dict[str, PhaseResult]:
         """
-        全Phase順次実行
+        全Phase実行（タプルで指定した組は並行、それ以外は順次）
         Returns: {Phase名: PhaseResult}
         """
         results = {}
         
-        for phase_class in self.config.phases:
-            phase = phase_class(self.job_id)
-            phase_name = phase.get_phase_name()
+        for step in self.config.phases:
+            if isinstance(step, tuple):
+                step_results = self._run_group(step)
+            else:
+                step_results = self._run_phase(step(self.job_id))
+            results.update(step_results)
             
-            # ステータス更新
+            failed = [name for name, r in step_results.items() if not r.success]
+            if failed and self.config.stop_on_error:
+                self.logger.error(f"Pipeline stopped due to {', '.join(failed)} failure")
+                break
+        
+        return results
+    
+    def _run_group(self, phase_classes: tuple[Type[BasePhase], ...]) -> dict[str, PhaseResult]:
+        """
+        並行グループ実行
+        各Phaseには開始前のjob.jsonのコピーを渡す（実行順に結果が左右されない）
+        """
+        phases = [phase_class(self.job_id) for phase_class in phase_classes]
+        
+        update_job_status(
+            job_id=self.job_id,
+            status="PROCESSING",
+            current_phase=" + ".join(phase.get_phase_name() for phase in phases)
+        )
+        
+        job = load_job(self.job_id)
+        with ThreadPoolExecutor(max_workers=len(phases)) as pool:
+            futures = [
+                pool.submit(self._run_phase, phase, copy.deepcopy(job), False)
+                for phase in phases
+            ]
+            step_results = {}
+            for future in futures:
+                step_results.update(future.result())
+        
+        return step_results
+    
+    def _run_phase(
+        self,
+        phase: BasePhase,
+        job: dict | None = None,
+        update_status: bool = True
+    ) -> dict[str, PhaseResult]:
+        """1Phase実行（例外はPhaseResultに変換）"""
+        phase_name = phase.get_phase_name()
+        
+        # ステータス更新
+        if update_status:
             update_job_status(
                 job_id=self.job_id,
                 status="PROCESSING",
                 current_phase=phase_name
             )
-            
-            self.logger.info(f"Executing {phase_name}")
-            
-            try:
-                result = phase.run()
-                results[phase_name] = result
-                
-                if not result.success and self.config.stop_on_error:
-                    self.logger.error(f"Pipeline stopped due to {phase_name} failure")
-                    break
-                    
-            except Exception as e:
-                self.logger.exception(f"Unexpected error in {phase_name}: {e}")
-                results[phase_name] = PhaseResult(
-                    success=False,
-                    output_files={},
-                    metadata={},
-                    error=f"予期しないエラー: {str(e)}"
-                )
-                
-                if self.config.stop_on_error:
-                    break
         
-        return results
+        self.logger.info(f"Executing {phase_name}")
+        
+        try:
+            return {phase_name: phase.run(job=job, env=self._env_snapshot)}
+            
+        except Exception as e:
+            self.logger.exception(f"Unexpected error in {phase_name}: {e}")
+            return {phase_name: PhaseResult(
+                success=False,
+                output_files={},
+                metadata={},
+                error=f"予期しないエラー: {str(e)}"
+            )}
     
     def get_summary(self, results: dict[str, PhaseResult]) -> dict:
         """パイプライン実行サマリー"""
         total = len(results)
-        success_count = sum(1 for r in results.values() if r.success)
-        total_duration = sum(r.duration_sec for r in results.values())
+        success_count = 0
+        total_duration = 0.0
+        for r in results.values():
+            success_count += r.success
+            total_duration += r.duration_sec
         
         return {
             "total_phases": total,
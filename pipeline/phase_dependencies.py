@@ -2,26 +2,48 @@
 Phase依存関係管理
 Design原則: 32. 前提条件は先に提示する
 """
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
-from enum import Enum
+import os
+from typing import Mapping, Optional
+from enum import IntEnum
 
-class PhaseID(Enum):
-    """Phase識別子（順序保証）"""
-    PRE_0_DOWNLOAD = "pre_0"
-    PRE_1_NORMALIZE = "pre_1"
-    PRE_2_SEPARATE = "pre_2"
-    PRE_3_WHISPERX = "pre_3"
-    PRE_3_5_VAD = "pre_3.5"
-    PRE_4_REF_AUDIO = "pre_4"
-    PRE_5_HALLUCINATION = "pre_5"
-    TRANSLATION = "translation"
-    TTS = "tts"
-    POST_1_TIMELINE = "post_1"
-    POST_2_MIX = "post_2"
-    POST_3_FINALIZE = "post_3"
-    POST_4_MANIFEST = "post_4"
+class PhaseID(IntEnum):
+    """Phase識別子（値は実行順。順序比較は整数比較で済む）"""
+    PRE_0_DOWNLOAD = 0
+    PRE_1_NORMALIZE = 1
+    PRE_2_SEPARATE = 2
+    PRE_3_WHISPERX = 3
+    PRE_3_5_VAD = 4
+    PRE_4_REF_AUDIO = 5
+    PRE_5_HALLUCINATION = 6
+    TRANSLATION = 7
+    TTS = 8
+    POST_1_TIMELINE = 9
+    POST_2_MIX = 10
+    POST_3_FINALIZE = 11
+    POST_4_MANIFEST = 12
+    
+    @property
+    def slug(self) -> str:
+        """従来の文字列識別子（"pre_3.5" など）"""
+        return _PHASE_SLUGS[self]
+
+_PHASE_SLUGS = {
+    PhaseID.PRE_0_DOWNLOAD: "pre_0",
+    PhaseID.PRE_1_NORMALIZE: "pre_1",
+    PhaseID.PRE_2_SEPARATE: "pre_2",
+    PhaseID.PRE_3_WHISPERX: "pre_3",
+    PhaseID.PRE_3_5_VAD: "pre_3.5",
+    PhaseID.PRE_4_REF_AUDIO: "pre_4",
+    PhaseID.PRE_5_HALLUCINATION: "pre_5",
+    PhaseID.TRANSLATION: "translation",
+    PhaseID.TTS: "tts",
+    PhaseID.POST_1_TIMELINE: "post_1",
+    PhaseID.POST_2_MIX: "post_2",
+    PhaseID.POST_3_FINALIZE: "post_3",
+    PhaseID.POST_4_MANIFEST: "post_4",
+}
 
 @dataclass
 class PhaseDependency:
@@ -31,6 +53,13 @@ class PhaseDependency:
     required_job_fields: list[str]  # job.jsonの必須フィールド（ドット記法）
     required_env_vars: list[str]  # 必須環境変数
     estimated_duration_min: float  # 推定実行時間（30分動画基準）
+    # required_job_fieldsをキー列に分解したもの（定義時に一度だけ計算）
+    required_job_field_keys: tuple[tuple[str, ...], ...] = field(init=False, repr=False)
+    
+    def __post_init__(self) -> None:
+        self.required_job_field_keys = tuple(
+            tuple(field_path.split('.')) for field_path in self.required_job_fields
+        )
 
 # 全Phase依存定義
 PHASE_DEPENDENCIES = {
@@ -107,26 +136,28 @@ def validate_phase_preconditions(
     phase_id: PhaseID,
     job_id: str,
     job: dict,
-    temp_dir: Path
+    temp_dir: Path,
+    env: Optional[Mapping[str, str]] = None
 ) -> tuple[bool, Optional[str]]:
     """
     Phase実行前の前提条件検証
+    env: 環境変数のスナップショット（省略時はos.environ）
     Returns: (成功/失敗, エラーメッセージ)
     Design原則: 15. エラーを回避する
     """
-    import os
+    if env is None:
+        env = os.environ
     
     dep = get_dependency(phase_id)
     
-    # ファイル存在チェック
+    # ファイル存在チェック（必須ファイルは各Phase高々1つ、ログ等の多いtemp_dirを列挙するよりstat 1回が安い）
     for filename in dep.required_files:
         file_path = temp_dir / filename
         if not file_path.exists():
             return False, f"必須ファイル '{filename}' が見つかりません（前のPhaseが失敗している可能性があります）"
     
     # job.jsonフィールドチェック
-    for field_path in dep.required_job_fields:
-        keys = field_path.split('.')
+    for field_path, keys in zip(dep.required_job_fields, dep.required_job_field_keys):
         current = job
         
         for key in keys:
@@ -136,7 +167,7 @@ def validate_phase_preconditions(
     
     # 環境変数チェック
     for env_var in dep.required_env_vars:
-        if not os.getenv(env_var):
+        if not env.get(env_var):
             return False, f"環境変数 '{env_var}' が設定されていません（.envファイルを確認してください）"
     
     return True, None
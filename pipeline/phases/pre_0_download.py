@@ -2,11 +2,11 @@
 Phase Pre-0: YouTube動画ダウンロード（リファクタ版）
 Design原則: 23. オブジェクトベース
 """
+import shutil
 import subprocess
-from pathlib import Path
 
 from pipeline.base_phase import BasePhase, PhaseResult, PhaseError
-from pipeline.utils.ffmpeg import get_audio_duration
+from app.utils.ffmpeg import get_audio_duration
 from config.settings import settings
 
 class DownloadPhase(BasePhase):
@@ -19,16 +19,14 @@ class DownloadPhase(BasePhase):
     
     def validate_inputs(self) -> None:
         """入力検証: job.json の source.url が存在するか"""
-        from app.services.storage import load_job
-        job = load_job(self.job_id)
+        job = self._get_job()
         
         if not job.get("source", {}).get("url"):
             raise PhaseError("source.url が設定されていません")
     
     def execute(self) -> PhaseResult:
         """YouTube動画ダウンロード実行"""
-        from app.services.storage import load_job
-        job = load_job(self.job_id)
+        job = self._get_job()
         video_url = job["source"]["url"]
         
         output_path = self.temp_dir / "original.wav"
@@ -42,19 +40,31 @@ class DownloadPhase(BasePhase):
             "--output", str(output_path.with_suffix('.%(ext)s')),
             "--no-playlist",
             "--no-warnings",
-            video_url
+            "--concurrent-fragments", str(settings.YTDLP_CONCURRENT_FRAGMENTS),
         ]
         
+        # aria2cがあれば複数接続で取得（TCPスロースタートを接続ごとに並行させる）
+        if shutil.which("aria2c"):
+            connections = min(settings.YTDLP_CONCURRENT_FRAGMENTS, 16)  # aria2cの上限は16
+            cmd += [
+                "--downloader", "aria2c",
+                "--downloader-args", f"aria2c:-x {connections} -s {connections} -k 1M",
+            ]
+        
+        cmd.append(video_url)
+        
         try:
+            # 進捗出力（stdout）は捨て、stderrは失敗時だけデコードする
             result = subprocess.run(
                 cmd,
-                capture_output=True,
-                text=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
                 timeout=self.get_timeout()
             )
             
             if result.returncode != 0:
-                raise PhaseError(f"yt-dlp failed: {result.stderr}")
+                stderr = result.stderr.decode("utf-8", errors="replace")
+                raise PhaseError(f"yt-dlp failed: {stderr}")
             
             # メタデータ取得
             duration = get_audio_duration(output_path)
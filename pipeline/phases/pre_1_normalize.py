@@ -1,12 +1,45 @@
 """
 Phase Pre-1: 音声正規化（リファクタ版）
 """
+import math
+import os
+import re
 import subprocess
 from pathlib import Path
+from typing import Optional
 
 from pipeline.base_phase import BasePhase, PhaseResult, PhaseError
 from config.settings import settings
 
+# 正規化目標（EBU R128）
+TARGET_LOUDNESS_LUFS = -23.0
+TARGET_TRUE_PEAK_DBTP = -2.0
+
+# これ以下は無音とみなしてゲインをかけない（ebur128の絶対ゲート）
+SILENCE_LOUDNESS_LUFS = -70.0
+# ゲインの上限（ほぼ無音の素材でノイズを持ち上げすぎない）
+MAX_GAIN_DB = 30.0
+
+# ffmpegのスレッド数（既定値任せだとフィルタグラフが1スレッドになることがある）
+FFMPEG_THREADS = str(os.cpu_count() or 1)
+
+# ebur128フィルタのSummary行（"I: -23.0 LUFS" / "Peak: -1.5 dBFS"、無音では "-inf"）
+_INTEGRATED_LOUDNESS_RE = re.compile(r"I:\s*(-?(?:inf|\d+(?:\.\d+)?))\s*LUFS")
+_TRUE_PEAK_RE = re.compile(r"Peak:\s*(-?(?:inf|\d+(?:\.\d+)?))\s*dBFS")
+
+def _normalization_gain(integrated: float, true_peak: Optional[float]) -> Optional[float]:
+    """
+    目標ラウドネスへのゲイン(dB)（トゥルーピークが上限を超えない範囲、MAX_GAIN_DBまで）
+    無音（-inf または絶対ゲート以下）ならNone
+    """
+    if not math.isfinite(integrated) or integrated <= SILENCE_LOUDNESS_LUFS:
+        return None
+    
+    gain_db = min(TARGET_LOUDNESS_LUFS - integrated, MAX_GAIN_DB)
+    if true_peak is not None and math.isfinite(true_peak):
+        gain_db = min(gain_db, TARGET_TRUE_PEAK_DBTP - true_peak)
+    return gain_db
+
 class NormalizePhase(BasePhase):
     
     def get_phase_name(self) -> str:
@@ -22,30 +55,42 @@ class NormalizePhase(BasePhase):
             raise PhaseError("original.wav が見つかりません")
     
     def execute(self) -> PhaseResult:
-        """音声正規化実行"""
+        """音声正規化実行（計測 → 固定ゲイン適用の2パス）"""
         input_path = self.temp_dir / "original.wav"
         output_path = self.temp_dir / "normalized.wav"
         
-        # ffmpeg で正規化
-        cmd = [
-            "ffmpeg", "-i", str(input_path),
-            "-af", "loudnorm=I=-23:TP=-2:LRA=7,aresample=16000",
-            "-ac", "1",
-            "-ar", "16000",
-            "-y",
-            str(output_path)
-        ]
-        
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=self.get_timeout()
+            # 1パス目: EBU R128の統合ラウドネスとトゥルーピークを計測
+            integrated, true_peak = self._measure_loudness(input_path)
+            
+            gain_db = _normalization_gain(integrated, true_peak)
+            
+            self.logger.info(
+                "Loudness measured",
+                integrated_lufs=integrated,
+                true_peak_dbtp=true_peak,
+                gain_db=None if gain_db is None else round(gain_db, 2)
             )
             
-            if result.returncode != 0:
-                raise PhaseError(f"ffmpeg normalization failed: {result.stderr}")
+            # 2パス目: 固定ゲイン + 16kHzモノラル化（リミッターを通さない、無音ならゲインなし）
+            if gain_db is None:
+                self.logger.warning("Input is silent, skipping loudness normalization")
+                filters = "aresample=16000"
+            else:
+                filters = f"volume={gain_db:.2f}dB,aresample=16000"
+            cmd = [
+                "ffmpeg",
+                "-filter_threads", FFMPEG_THREADS,
+                "-i", str(input_path),
+                "-threads", FFMPEG_THREADS,
+                "-af", filters,
+                "-ac", "1",
+                "-ar", "16000",
+                "-y",
+                str(output_path)
+            ]
+            
+            self.run_command(cmd, "normalize.log", "ffmpeg normalization failed")
             
             # 元ファイル削除（ディスク節約）
             input_path.unlink()
@@ -60,6 +105,33 @@ class NormalizePhase(BasePhase):
         except subprocess.TimeoutExpired:
             raise PhaseError("正規化がタイムアウトしました")
     
+    def _measure_loudness(self, input_path: Path) -> tuple[float, Optional[float]]:
+        """
+        ebur128フィルタで統合ラウドネス(LUFS)とトゥルーピーク(dBTP)を計測
+        Returns: (統合ラウドネス, トゥルーピーク ※無音などで取れなければNone)
+        """
+        cmd = [
+            "ffmpeg", "-hide_banner", "-nostats",
+            "-filter_threads", FFMPEG_THREADS,
+            "-i", str(input_path),
+            "-threads", FFMPEG_THREADS,
+            # フレームごとのログは出さず、最後のSummaryだけを読む
+            "-af", "ebur128=peak=true:framelog=verbose",
+            "-f", "null", "-"
+        ]
+        
+        # Summaryは出力の末尾にあるので、ログ末尾だけを読めば足りる
+        output = self.run_command(cmd, "loudness.log", "ffmpeg loudness measurement failed")
+        
+        loudness = _INTEGRATED_LOUDNESS_RE.findall(output)
+        if not loudness:
+            raise PhaseError("ラウドネスを計測できませんでした")
+        
+        peaks = _TRUE_PEAK_RE.findall(output)
+        true_peak = float(peaks[-1]) if peaks else None
+        
+        return float(loudness[-1]), true_peak
+    
     def validate_outputs(self, result: PhaseResult) -> None:
         """成果物検証"""
         if "normalized" not in result.output_files:
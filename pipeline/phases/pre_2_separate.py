@@ -7,8 +7,15 @@ from pathlib import Path
 
 from pipeline.base_phase import BasePhase, PhaseResult, PhaseError
 from pipeline.phase_dependencies import PhaseID
+from pipeline.utils.pre_voice import PRE_VOICE_SAMPLE_RATE, save_pre_voice_samples
 from config.settings import settings
 
+DEMUCS_MODEL = "htdemucs"
+
+# Demucs省略判定（BGMの乏しい音声）の解析範囲
+CLEAN_SPEECH_PROBE_SEC = 60
+CLEAN_SPEECH_N_FFT = 1024
+
 class SeparatePhase(BasePhase):
     """Demucsで音声とBGMを分離"""
     
@@ -24,50 +31,37 @@ class SeparatePhase(BasePhase):
     def execute(self) -> PhaseResult:
         """Demucs実行"""
         input_path = self.temp_dir / "normalized.wav"
-        demucs_output = self.temp_dir / "demucs_output"
-        demucs_output.mkdir(exist_ok=True)
+        pre_voice = self.temp_dir / "pre_voice.wav"
+        pre_bgm = self.temp_dir / "pre_bgm.wav"
         
         try:
-            # Demucs実行
-            cmd = [
-                "demucs",
-                "--two-stems=vocals",
-                "--device", "cpu",
-                "--out", str(demucs_output),
-                str(input_path)
-            ]
-            
-            # Design原則: 65. 進捗を返す
-            self.logger.info("Starting Demucs separation (CPU mode, estimated 60-90 min)")
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=self.get_timeout()
-            )
-            
-            if result.returncode != 0:
-                raise PhaseError(f"Demucs failed: {result.stderr}")
-            
-            # 出力ファイル移動
-            model_dir = demucs_output / "htdemucs" / "normalized"
-            vocals_src = model_dir / "vocals.wav"
-            instrumental_src = model_dir / "no_vocals.wav"
-            
-            if not vocals_src.exists():
-                raise PhaseError("Demucs vocals.wav not generated")
+            # BGMがほぼ無い音声ならDemucsを省略（normalized.wavをそのまま使う）
+            if self._is_clean_speech(input_path):
+                # 生サンプルを先に書く（失敗してもnormalized.wavが残り、リトライで再判定できる）
+                self._save_raw_samples(input_path)
+                input_path.replace(pre_voice)
+                
+                return PhaseResult(
+                    success=True,
+                    output_files={"pre_voice": pre_voice, "pre_bgm": None},
+                    metadata={}
+                )
             
-            pre_voice = self.temp_dir / "pre_voice.wav"
-            pre_bgm = self.temp_dir / "pre_bgm.wav"
+            device = self._demucs_device()
             
-            shutil.move(str(vocals_src), str(pre_voice))
+            # Design原則: 65. 進捗を返す
+            if device == "cpu":
+                self.logger.info("Starting Demucs separation (CPU mode, estimated 60-90 min)")
+            else:
+                self.logger.info(f"Starting Demucs separation (device={device})")
             
-            if instrumental_src.exists():
-                shutil.move(str(instrumental_src), str(pre_bgm))
+            try:
+                self._separate_in_process(input_path, pre_voice, pre_bgm, device)
+            except ImportError as e:
+                self.logger.warning(f"Demucs Python API unavailable, falling back to CLI: {e}")
+                self._separate_cli(input_path, pre_voice, pre_bgm, device)
             
             # クリーンアップ
-            shutil.rmtree(demucs_output)
             input_path.unlink()
             
             self.logger.info("Demucs separation completed")
@@ -85,6 +79,161 @@ class SeparatePhase(BasePhase):
             raise PhaseError("Demucs timed out")
         except Exception as e:
             raise PhaseError(f"BGM separation failed: {str(e)}")
+    
+    def _is_clean_speech(self, input_path: Path) -> bool:
+        """
+        BGMの乏しい音声かを簡易判定（中央付近60秒の4-8kHz帯と80Hz-4kHz帯のエネルギー比）
+        DEMUCS_SKIP_RATIO=0（既定）またはjobの pipeline_params.force_demucs で無効
+        """
+        if settings.DEMUCS_SKIP_RATIO <= 0:
+            return False
+        if self._get_job().get("pipeline_params", {}).get("force_demucs", False):
+            return False
+        
+        import torch
+        import torchaudio
+        
+        info = torchaudio.info(str(input_path))
+        sample_rate = info.sample_rate
+        probe_frames = min(info.num_frames, CLEAN_SPEECH_PROBE_SEC * sample_rate)
+        offset = (info.num_frames - probe_frames) // 2
+        
+        probe, _ = torchaudio.load(str(input_path), frame_offset=offset, num_frames=probe_frames)
+        if probe.shape[-1] < CLEAN_SPEECH_N_FFT:
+            return False
+        
+        spectrum = torch.stft(
+            probe.mean(dim=0),
+            n_fft=CLEAN_SPEECH_N_FFT,
+            window=torch.hann_window(CLEAN_SPEECH_N_FFT),
+            return_complex=True
+        ).abs().pow(2).sum(dim=1)
+        
+        hz_per_bin = sample_rate / CLEAN_SPEECH_N_FFT
+        voice_band = spectrum[int(80 / hz_per_bin):int(4000 / hz_per_bin)].sum()
+        high_band = spectrum[int(4000 / hz_per_bin):int(8000 / hz_per_bin) + 1].sum()
+        
+        ratio = float(high_band / voice_band) if voice_band > 0 else float("inf")
+        is_clean = ratio < settings.DEMUCS_SKIP_RATIO
+        
+        self.logger.info(
+            "Clean speech check",
+            high_band_ratio=round(ratio, 4),
+            threshold=settings.DEMUCS_SKIP_RATIO,
+            skip_demucs=is_clean
+        )
+        return is_clean
+    
+    def _save_raw_samples(self, wav_path: Path) -> None:
+        """Demucsを省略した場合もPre-3 / Pre-3.5向けの生サンプルを残す"""
+        import torchaudio
+        
+        waveform, sample_rate = torchaudio.load(str(wav_path))
+        if sample_rate == PRE_VOICE_SAMPLE_RATE and waveform.shape[0] == 1:
+            save_pre_voice_samples(self.temp_dir, waveform[0].numpy())
+    
+    def _demucs_device(self) -> str:
+        """実行デバイス（DEMUCS_DEVICE=autoならCUDAが使えるときだけGPU）"""
+        if settings.DEMUCS_DEVICE != "auto":
+            return settings.DEMUCS_DEVICE
+        
+        import torch
+        
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    
+    def _separate_in_process(
+        self,
+        input_path: Path,
+        pre_voice: Path,
+        pre_bgm: Path,
+        device: str
+    ) -> None:
+        """
+        DemucsをPython APIで実行し、2ステムを直接書き出す
+        （CLIの出力ツリーへの書き込み→移動を省く）
+        """
+        import torch
+        import torchaudio
+        from demucs.apply import apply_model
+        from demucs.audio import convert_audio
+        from demucs.pretrained import get_model
+        
+        model = get_model(DEMUCS_MODEL)
+        model.eval()
+        
+        wav, sample_rate = torchaudio.load(str(input_path))
+        wav = convert_audio(wav, sample_rate, model.samplerate, model.audio_channels)
+        
+        # CLIと同じ正規化（入力の平均・標準偏差で正規化して戻す）
+        ref = wav.mean(0)
+        mean, std = ref.mean(), ref.std()
+        wav = (wav - mean) / std
+        
+        with torch.no_grad():
+            sources = apply_model(
+                model,
+                wav[None],
+                device=device,
+                overlap=0.25,
+                progress=False
+            )[0]
+        sources = sources * std + mean
+        
+        vocals_index = model.sources.index("vocals")
+        vocals = sources[vocals_index]
+        no_vocals = sources.sum(0) - vocals
+        
+        # 入力（16kHzモノラル）の形式に戻して書き出す
+        for stem, path in ((vocals, pre_voice), (no_vocals, pre_bgm)):
+            stem = convert_audio(stem, model.samplerate, PRE_VOICE_SAMPLE_RATE, 1)
+            torchaudio.save(
+                str(path),
+                stem,
+                PRE_VOICE_SAMPLE_RATE,
+                encoding="PCM_S",
+                bits_per_sample=16
+            )
+            
+            # Pre-3 / Pre-3.5 がwavを再デコードせずに済むよう生サンプルも残す
+            if path == pre_voice:
+                save_pre_voice_samples(self.temp_dir, stem[0].numpy())
+    
+    def _separate_cli(
+        self,
+        input_path: Path,
+        pre_voice: Path,
+        pre_bgm: Path,
+        device: str
+    ) -> None:
+        """demucs CLIで分離（Python APIが使えない環境向け）"""
+        demucs_output = self.temp_dir / "demucs_output"
+        demucs_output.mkdir(exist_ok=True)
+        
+        cmd = [
+            "demucs",
+            "--two-stems=vocals",
+            "--device", device,
+            "--out", str(demucs_output),
+            str(input_path)
+        ]
+        
+        # 進捗バー（制御文字込み）が大量に出るためログファイルへ
+        self.run_command(cmd, "demucs.log", "Demucs failed")
+        
+        # 出力ファイル移動
+        model_dir = demucs_output / DEMUCS_MODEL / input_path.stem
+        vocals_src = model_dir / "vocals.wav"
+        instrumental_src = model_dir / "no_vocals.wav"
+        
+        if not vocals_src.exists():
+            raise PhaseError("Demucs vocals.wav not generated")
+        
+        shutil.move(str(vocals_src), str(pre_voice))
+        
+        if instrumental_src.exists():
+            shutil.move(str(instrumental_src), str(pre_bgm))
+        
+        shutil.rmtree(demucs_output)
 
 def phase_separate(job_id: str) -> None:
     """Phase Pre-2 実行"""
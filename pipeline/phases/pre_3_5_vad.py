@@ -2,13 +2,66 @@
 Phase Pre-3.5: Silero VAD 詳細解析
 Design原則: 2. 簡単にする - 負荷を減らす
 """
+import numpy as np
 import torch
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 from pipeline.base_phase import BasePhase, PhaseResult, PhaseError
-from app.services.storage import load_job
+from pipeline.utils.pre_voice import PRE_VOICE_SAMPLE_RATE, load_pre_voice_samples
+from pipeline.utils.silero_vad import load_silero_vad, new_silero_vad_model
 from config.settings import settings
 
+VAD_THRESHOLD = 0.5
+
+# 並行VADのチャンク長の下限（短い音声は分割しない）
+VAD_MIN_CHUNK_SEC = 300
+
+# チャンク境界で分かれた発話区間をつなぐ許容幅（サンプル数）
+VAD_BOUNDARY_TOLERANCE = 1536
+
+def _speech_intervals(speech_timestamps: list[dict]) -> np.ndarray:
+    """Silero VADの [{'start', 'end'}, ...] を (T, 2) のint32配列に詰める"""
+    return np.fromiter(
+        (sample for ts in speech_timestamps for sample in (ts['start'], ts['end'])),
+        dtype=np.int32,
+        count=2 * len(speech_timestamps)
+    ).reshape(-1, 2)
+
+def _speech_samples_between(
+    speech: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray
+) -> np.ndarray:
+    """
+    各区間 [starts[i], ends[i]) に含まれる発話サンプル数
+    speech（_speech_intervalsの出力）は時刻順で重ならない（Silero VADの出力）前提で、
+    位置xまでの累積発話量を二分探索で引いて差を取る（O((S+T) log T)）
+    """
+    if len(speech) == 0:
+        return np.zeros(len(starts), dtype=np.int64)
+    
+    speech_starts = speech[:, 0]
+    speech_ends = speech[:, 1]
+    cumulative = np.concatenate(([0], np.cumsum(speech_ends - speech_starts, dtype=np.int64)))
+    
+    def speech_before(x: np.ndarray) -> np.ndarray:
+        # xより前に始まる発話区間の合計から、xを越えてはみ出た分を引く
+        count = np.searchsorted(speech_starts, x, side='right')
+        last = np.maximum(count - 1, 0)
+        overshoot = np.where(count > 0, np.maximum(speech_ends[last] - x, 0), 0)
+        return cumulative[count] - overshoot
+    
+    return np.maximum(speech_before(ends) - speech_before(starts), 0)
+
+@lru_cache(maxsize=8)
+def _resampler(orig_freq: int, new_freq: int) -> torch.nn.Module:
+    """リサンプラー（フィルタ係数の計算はサンプルレートの組ごとに1回）"""
+    import torchaudio
+    
+    return torchaudio.transforms.Resample(orig_freq, new_freq)
+
 class VADPhase(BasePhase):
     """
     Silero VADで各セグメントの音声割合を計算
@@ -29,74 +82,50 @@ class VADPhase(BasePhase):
         if not input_path.exists():
             raise PhaseError("pre_voice.wav が見つかりません")
         
-        job = load_job(self.job_id)
+        job = self._get_job()
         if not job.get("segments"):
             raise PhaseError("segments が存在しません（Phase Pre-3を先に実行してください）")
     
     def execute(self) -> PhaseResult:
         """Silero VAD実行"""
-        import torchaudio
-        
         input_path = self.temp_dir / "pre_voice.wav"
-        job = load_job(self.job_id)
+        job = self._get_job()
         segments = job["segments"]
         
         try:
-            # Silero VADモデルロード
-            model, utils = torch.hub.load(
-                repo_or_dir='snakers4/silero-vad',
-                model='silero_vad',
-                force_reload=False,
-                onnx=False
-            )
-            
-            get_speech_timestamps = utils[0]
-            
-            # 音声読み込み（16kHz）
-            waveform, sample_rate = torchaudio.load(str(input_path))
+            # Silero VADモデルロード（Pre-3の間に先読み済みならそれを使う）
+            model, get_speech_timestamps = load_silero_vad()
             
-            if sample_rate != 16000:
-                resampler = torchaudio.transforms.Resample(sample_rate, 16000)
-                waveform = resampler(waveform)
-                sample_rate = 16000
-            
-            # モノラル化
-            if waveform.shape[0] > 1:
-                waveform = waveform.mean(dim=0, keepdim=True)
-            
-            waveform = waveform.squeeze(0)
+            # 音声読み込み（16kHz）：Pre-2の生サンプルがあればデコード・リサンプル不要
+            samples = load_pre_voice_samples(self.temp_dir)
+            if samples is not None:
+                waveform = torch.from_numpy(samples)
+                sample_rate = PRE_VOICE_SAMPLE_RATE
+            else:
+                waveform, sample_rate = self._load_wav(input_path)
             
             self.logger.info(f"Running VAD on {len(segments)} segments")
             
             # 全体のVADタイムスタンプ取得
-            speech_timestamps = get_speech_timestamps(
-                waveform,
-                model,
-                threshold=0.5,
-                sampling_rate=sample_rate
+            speech = self._detect_speech(waveform, sample_rate, model, get_speech_timestamps)
+            
+            # 各セグメントに対してspeech_ratioを計算（全セグメントを一括で集計）
+            seg_starts = np.fromiter(
+                (int(seg['start'] * sample_rate) for seg in segments), dtype=np.int64, count=len(segments)
+            )
+            seg_ends = np.fromiter(
+                (int(seg['end'] * sample_rate) for seg in segments), dtype=np.int64, count=len(segments)
             )
+            speech_samples = _speech_samples_between(speech, seg_starts, seg_ends)
             
-            # 各セグメントに対してspeech_ratioを計算
-            for seg in segments:
-                seg_start_sample = int(seg['start'] * sample_rate)
-                seg_end_sample = int(seg['end'] * sample_rate)
+            for seg, samples in zip(segments, speech_samples.tolist()):
                 seg_duration = seg['end'] - seg['start']
                 
                 if seg_duration <= 0:
                     seg['vad_speech_ratio'] = 0.0
                     continue
                 
-                # そのセグメント範囲内にある speech_timestamps を集計
-                speech_duration_samples = 0
-                
-                for ts in speech_timestamps:
-                    overlap_start = max(ts['start'], seg_start_sample)
-                    overlap_end = min(ts['end'], seg_end_sample)
-                    
-                    if overlap_start < overlap_end:
-                        speech_duration_samples += (overlap_end - overlap_start)
-                
-                speech_duration_sec = speech_duration_samples / sample_rate
+                speech_duration_sec = samples / sample_rate
                 seg['vad_speech_ratio'] = min(speech_duration_sec / seg_duration, 1.0)
             
             self.logger.info("VAD analysis completed")
@@ -111,9 +140,83 @@ class VADPhase(BasePhase):
             self.logger.error(f"VAD execution failed: {e}")
             raise PhaseError(f"VAD解析に失敗しました: {str(e)}")
     
+    def _detect_speech(
+        self,
+        waveform: torch.Tensor,
+        sample_rate: int,
+        model,
+        get_speech_timestamps
+    ) -> np.ndarray:
+        """
+        発話区間 (T, 2) を取得
+        長い音声はチャンクに分けてスレッドで並行実行する（onnxruntimeは推論中GILを解放する）
+        """
+        n_chunks = min(
+            settings.VAD_WORKERS,
+            len(waveform) // (VAD_MIN_CHUNK_SEC * sample_rate)
+        )
+        if n_chunks <= 1:
+            return _speech_intervals(get_speech_timestamps(
+                waveform,
+                model,
+                threshold=VAD_THRESHOLD,
+                sampling_rate=sample_rate
+            ))
+        
+        bounds = np.linspace(0, len(waveform), n_chunks + 1, dtype=np.int64).tolist()
+        
+        def detect(index: int) -> list[list[int]]:
+            chunk_model = model if index == 0 else new_silero_vad_model()
+            offset = bounds[index]
+            timestamps = get_speech_timestamps(
+                waveform[offset:bounds[index + 1]],
+                chunk_model,
+                threshold=VAD_THRESHOLD,
+                sampling_rate=sample_rate
+            )
+            return [[ts['start'] + offset, ts['end'] + offset] for ts in timestamps]
+        
+        self.logger.debug(f"Running VAD in {n_chunks} parallel chunks")
+        
+        with ThreadPoolExecutor(max_workers=n_chunks) as pool:
+            parts = list(pool.map(detect, range(n_chunks)))
+        
+        # チャンク境界をまたぐ発話（前チャンクの末尾まで続き、次チャンクの先頭から始まる）をつなぐ
+        merged = parts[0]
+        for boundary, part in zip(bounds[1:-1], parts[1:]):
+            if (
+                merged and part
+                and merged[-1][1] >= boundary - VAD_BOUNDARY_TOLERANCE
+                and part[0][0] <= boundary + VAD_BOUNDARY_TOLERANCE
+            ):
+                merged[-1][1] = part[0][1]
+                part = part[1:]
+            merged.extend(part)
+        
+        return np.array(merged, dtype=np.int32).reshape(-1, 2)
+    
+    def _load_wav(self, input_path: Path) -> tuple[torch.Tensor, int]:
+        """pre_voice.wavを16kHzモノラルの1次元テンソルとして読み込む"""
+        import torchaudio
+        
+        waveform, sample_rate = torchaudio.load(str(input_path))
+        
+        # モノラル化（1chならビューを取るだけ。リサンプルより先に行い1ch分だけ処理する）
+        if waveform.shape[0] == 1:
+            waveform = waveform[0]
+        else:
+            waveform = waveform.mean(dim=0)
+        
+        # Demucs CLIフォールバックの出力（44.1kHzステレオ）のみここを通る
+        if sample_rate != PRE_VOICE_SAMPLE_RATE:
+            waveform = _resampler(sample_rate, PRE_VOICE_SAMPLE_RATE)(waveform)
+            sample_rate = PRE_VOICE_SAMPLE_RATE
+        
+        return waveform, sample_rate
+    
     def validate_outputs(self, result: PhaseResult) -> None:
         """成果物検証"""
-        if "segments" not in result.meta
+        if "segments" not in result.metadata:
             raise PhaseError("segments が更新されていません")
         
         segments = result.metadata["segments"]
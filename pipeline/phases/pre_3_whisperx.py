@@ -1,14 +1,94 @@
 """
 Phase Pre-3: WhisperX（リファクタ版）
 """
+import gc
 import whisperx
 import torch
-import gc
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
 
 from pipeline.base_phase import BasePhase, PhaseResult, PhaseError
 from pipeline.phase_dependencies import PhaseID
-from app.services.storage import load_job
+from pipeline.utils.pre_voice import load_pre_voice_samples
+from pipeline.utils.silero_vad import prefetch_silero_vad
 from config.settings import settings
+from config.schemas import JOB_SCHEMA_VERSION
+
+# セグメントの初期状態（セグメントごとにdict()で浅いコピーを作る。値はすべて不変）
+_INITIAL_FLAGS = MappingProxyType({
+    "suspected_hallucination": False,
+    "silenced": False,
+    "shortened": False
+})
+
+_INITIAL_TRANSLATION = MappingProxyType({
+    "provider": None,
+    "retries": 0,
+    "status": "pending"
+})
+
+_INITIAL_TTS = MappingProxyType({
+    "wav_path": None,
+    "status": "pending",
+    "retries": 0
+})
+
+_INITIAL_TIMING = MappingProxyType({
+    "tts_duration": None,
+    "final_start": None,
+    "final_end": None,
+    "atempo_applied": None,
+    "overlap_applied": 0.0
+})
+
+DEVICE = "cpu"
+
+# WHISPERX_KEEP_MODELS=1ならワーカープロセス内で保持し、次のジョブで読み込み直さない
+# （同じ言語・設定が続く前提で各1組だけ持つ）。既定ではPhase終了時に解放する
+@lru_cache(maxsize=1)
+def _get_asr_model(language: str, compute_type: str, threads: int):
+    """ASRモデル（large-v2）"""
+    return whisperx.load_model(
+        "large-v2",
+        device=DEVICE,
+        compute_type=compute_type,
+        language=language,
+        threads=threads
+    )
+
+@lru_cache(maxsize=1)
+def _get_align_model(language_code: str):
+    """アライメントモデル (model, metadata)"""
+    return whisperx.load_align_model(language_code=language_code, device=DEVICE)
+
+@lru_cache(maxsize=1)
+def _get_diarize_model(hf_token: str):
+    """話者分離パイプライン"""
+    return whisperx.DiarizationPipeline(use_auth_token=hf_token, device=DEVICE)
+
+def _release_models() -> None:
+    """保持しているモデルを解放（Demucs・TTSなど後続のモデルとメモリを取り合わない）"""
+    _get_asr_model.cache_clear()
+    _get_align_model.cache_clear()
+    _get_diarize_model.cache_clear()
+    gc.collect()
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+def _word_columns(words: list[dict]) -> dict[str, list]:
+    """
+    単語タイムスタンプを列ごとの配列にまとめる（単語ごとのdictをやめる）
+    job.jsonでキー名の繰り返しがなくなり、後段はnp.asarrayで一括処理できる
+    アライメントできなかった単語（数字など）のstart/end/scoreはNone
+    """
+    return {
+        "text": [w.get("word", "") for w in words],
+        "start": [w.get("start") for w in words],
+        "end": [w.get("end") for w in words],
+        "score": [w.get("score") for w in words]
+    }
 
 class WhisperXPhase(BasePhase):
     """WhisperXで音声認識 + 話者分離"""
@@ -25,104 +105,104 @@ class WhisperXPhase(BasePhase):
     def execute(self) -> PhaseResult:
         """WhisperX実行"""
         input_path = self.temp_dir / "pre_voice.wav"
-        job = load_job(self.job_id)
+        job = self._get_job()
         src_lang = job["languages"]["src_lang"]
         
-        device = "cpu"
-        compute_type = "float32"
+        # Pre-3.5で使うVADモデルを先読み（ASR中にダウンロード・読み込みを済ませる）
+        prefetch_silero_vad()
         
         try:
+            try:
+                diarize_segments = self._transcribe(input_path, src_lang)
+            finally:
+                if not settings.WHISPERX_KEEP_MODELS:
+                    _release_models()
+            
+            self.logger.progress(3, 3, "Diarization completed")
+            
+            # セグメント変換
+            segments = self._convert_segments(diarize_segments)
+            speakers = self._extract_speakers(segments)
+            
+            self.logger.info(
+                f"WhisperX completed",
+                total_segments=len(segments),
+                unique_speakers=len(speakers)
+            )
+            
+            return PhaseResult(
+                success=True,
+                output_files={},
+                metadata={
+                    # words を列形式で書き出すため、途中から処理した旧版のジョブも版を上げる
+                    "schema_version": JOB_SCHEMA_VERSION,
+                    "segments": segments,
+                    "speakers": speakers
+                }
+            )
+            
+        except Exception as e:
+            raise PhaseError(f"WhisperX failed: {str(e)}")
+    
+    def _transcribe(self, input_path: Path, src_lang: str) -> list:
+        """
+        ASR → アライメント → 話者分離
+        モデルへの参照はこのメソッド内に閉じる（戻った後に_release_modelsで解放できる）
+        """
+        # アライメント・話者分離モデルの読み込みはASRと並行して進める
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            align_future = pool.submit(_get_align_model, src_lang)
+            diarize_future = None
+            if settings.HF_TOKEN:
+                diarize_future = pool.submit(_get_diarize_model, settings.HF_TOKEN)
+            
             # Step 1: ASR
             self.logger.info(f"Loading WhisperX model (lang={src_lang})")
             
-            model = whisperx.load_model(
-                "large-v2",
-                device=device,
-                compute_type=compute_type,
-                language=src_lang
+            model = _get_asr_model(
+                src_lang,
+                settings.WHISPERX_COMPUTE_TYPE,
+                settings.WHISPERX_CPU_THREADS
             )
             
-            audio = whisperx.load_audio(str(input_path))
+            # Pre-2が残した16kHzモノラルの生サンプルがあればffmpegでのデコードを省く
+            audio = load_pre_voice_samples(self.temp_dir)
+            if audio is None:
+                audio = whisperx.load_audio(str(input_path))
             result = model.transcribe(audio, language=src_lang)
             
             self.logger.progress(1, 3, "Transcription completed")
             
-            # モデル解放（メモリ節約）
-            del model
-            gc.collect()
-            
             # Step 2: Alignment
-            self.logger.info("Loading alignment model")
-            
-            model_a, metadata = whisperx.load_align_model(
-                language_code=src_lang,
-                device=device
-            )
+            model_a, metadata = align_future.result()
             
             result = whisperx.align(
                 result["segments"],
                 model_a,
                 metadata,
                 audio,
-                device
+                DEVICE
             )
             
             self.logger.progress(2, 3, "Alignment completed")
             
-            # モデル解放
-            del model_a
-            gc.collect()
-            
             # Step 3: Diarization
-            if not settings.HF_TOKEN:
+            if diarize_future is None:
                 self.logger.warning("HF_TOKEN not set, skipping diarization")
                 diarize_segments = result["segments"]
             else:
-                self.logger.info("Loading diarization model")
-                
-                diarize_model = whisperx.DiarizationPipeline(
-                    use_auth_token=settings.HF_TOKEN,
-                    device=device
-                )
+                diarize_model = diarize_future.result()
                 
                 diarize_segments_obj = diarize_model(audio)
                 result = whisperx.assign_word_speakers(diarize_segments_obj, result)
                 diarize_segments = result["segments"]
-                
-                # モデル解放
-                del diarize_model
-                gc.collect()
-            
-            self.logger.progress(3, 3, "Diarization completed")
-            
-            # セグメント変換
-            segments = self._convert_segments(diarize_segments)
-            speakers = self._extract_speakers(segments)
-            
-            self.logger.info(
-                f"WhisperX completed",
-                total_segments=len(segments),
-                unique_speakers=len(speakers)
-            )
-            
-            return PhaseResult(
-                success=True,
-                output_files={},
-                metadata={
-                    "segments": segments,
-                    "speakers": speakers
-                }
-            )
-            
-        except Exception as e:
-            raise PhaseError(f"WhisperX failed: {str(e)}")
+        
+        return diarize_segments
     
     def _convert_segments(self, whisperx_segments: list) -> list:
         """WhisperXセグメントをjob.json形式に変換"""
-        segments = []
-        
-        for i, seg in enumerate(whisperx_segments):
-            segment = {
+        return [
+            {
                 "seg_id": f"seg_{i:04d}",
                 "start": seg["start"],
                 "end": seg["end"],
@@ -130,44 +210,22 @@ class WhisperXPhase(BasePhase):
                 "tgt_text": None,
                 "speaker_id": seg.get("speaker", "SPEAKER_00"),
                 
-                "flags": {
-                    "suspected_hallucination": False,
-                    "silenced": False,
-                    "shortened": False
-                },
+                "flags": dict(_INITIAL_FLAGS),
                 
                 "whisper": {
                     "no_speech_prob": seg.get("no_speech_prob", 0.0),
                     "avg_logprob": seg.get("avg_logprob", 0.0),
-                    "words": seg.get("words", [])
+                    "words": _word_columns(seg.get("words", []))
                 },
                 
                 "vad_speech_ratio": None,
                 
-                "translation": {
-                    "provider": None,
-                    "retries": 0,
-                    "status": "pending"
-                },
-                
-                "tts": {
-                    "wav_path": None,
-                    "status": "pending",
-                    "retries": 0
-                },
-                
-                "timing": {
-                    "tts_duration": None,
-                    "final_start": None,
-                    "final_end": None,
-                    "atempo_applied": None,
-                    "overlap_applied": 0.0
-                }
+                "translation": dict(_INITIAL_TRANSLATION),
+                "tts": dict(_INITIAL_TTS),
+                "timing": dict(_INITIAL_TIMING)
             }
-            
-            segments.append(segment)
-        
-        return segments
+            for i, seg in enumerate(whisperx_segments)
+        ]
     
     def _extract_speakers(self, segments: list) -> list:
         """話者リストを抽出"""
@@ -2,14 +2,45 @@
 Phase Pre-4: ref_audio 自動抽出
 Design原則: 45. 値を入力させるのではなく結果を選ばせる
 """
-import shutil
-from pathlib import Path
+import numpy as np
 
 from pipeline.base_phase import BasePhase, PhaseResult, PhaseError
-from app.services.storage import load_job
-from pipeline.utils.ffmpeg import extract_audio_segment
+from app.utils.ffmpeg import extract_audio_segments
 from config.settings import settings
 
+class _NeighborIndex:
+    """
+    他話者混入チェック用の区間インデックス
+    開始時刻順・終了時刻順に並べた配列を二分探索し、±0.5秒の範囲だけを調べる（O(log N + k)）
+    """
+    
+    WINDOW_SEC = 0.5
+    
+    def __init__(self, segments: list[dict]):
+        starts = np.fromiter((s['start'] for s in segments), dtype=np.float64, count=len(segments))
+        ends = np.fromiter((s['end'] for s in segments), dtype=np.float64, count=len(segments))
+        speaker_ids = np.array([s['speaker_id'] for s in segments])
+        
+        by_start = np.argsort(starts, kind='stable')
+        by_end = np.argsort(ends, kind='stable')
+        self.starts = starts[by_start]
+        self.start_speakers = speaker_ids[by_start]
+        self.ends = ends[by_end]
+        self.end_speakers = speaker_ids[by_end]
+    
+    def has_other_speaker_near(self, speaker_id: str, seg_start: float, seg_end: float) -> bool:
+        """他話者のセグメントが前後0.5秒以内で接しているか"""
+        return (
+            self._any_other(self.starts, self.start_speakers, seg_end, speaker_id)
+            or self._any_other(self.ends, self.end_speakers, seg_start, speaker_id)
+        )
+    
+    def _any_other(self, times: np.ndarray, speakers: np.ndarray, at: float, speaker_id: str) -> bool:
+        # |t - at| < WINDOW_SEC を満たす範囲
+        lo = np.searchsorted(times, at - self.WINDOW_SEC, side='right')
+        hi = np.searchsorted(times, at + self.WINDOW_SEC, side='left')
+        return bool(np.any(speakers[lo:hi] != speaker_id))
+
 class RefAudioPhase(BasePhase):
     """
     話者ごとにref_audio候補を抽出・スコアリング
@@ -30,7 +61,7 @@ class RefAudioPhase(BasePhase):
         if not input_path.exists():
             raise PhaseError("pre_voice.wav が見つかりません")
         
-        job = load_job(self.job_id)
+        job = self._get_job()
         if not job.get("segments"):
             raise PhaseError("segments が存在しません")
         if not job.get("speakers"):
@@ -39,7 +70,7 @@ class RefAudioPhase(BasePhase):
     def execute(self) -> PhaseResult:
         """ref_audio抽出実行"""
         input_path = self.temp_dir / "pre_voice.wav"
-        job = load_job(self.job_id)
+        job = self._get_job()
         segments = job["segments"]
         speakers = job["speakers"]
         
@@ -47,6 +78,10 @@ class RefAudioPhase(BasePhase):
         ref_audio_dir.mkdir(parents=True, exist_ok=True)
         
         output_files = {}
+        extractions = []
+        
+        # 他話者混入チェック用のインデックス（1回だけ構築）
+        neighbors = _NeighborIndex(segments)
         
         try:
             for speaker in speakers:
@@ -65,7 +100,7 @@ class RefAudioPhase(BasePhase):
                 # スコアリング
                 scored = []
                 for seg in speaker_segments:
-                    score = self._score_ref_candidate(seg, job)
+                    score = self._score_ref_candidate(seg, neighbors)
                     scored.append((score, seg))
                 
                 # 上位3候補を選択
@@ -92,11 +127,9 @@ class RefAudioPhase(BasePhase):
                 
                 ref_wav_path = ref_audio_dir / f"{speaker_id}_01.wav"
                 
-                extract_audio_segment(
-                    input_path=input_path,
-                    output_path=ref_wav_path,
-                    start_sec=best_seg["start"],
-                    duration_sec=best_seg["end"] - best_seg["start"]
+                # 切り出しは全話者分をまとめて並行実行する
+                extractions.append(
+                    (ref_wav_path, best_seg["start"], best_seg["end"] - best_seg["start"])
                 )
                 
                 speaker["ref_audio_wav"] = str(ref_wav_path)
@@ -107,10 +140,12 @@ class RefAudioPhase(BasePhase):
                 output_files[speaker_id] = ref_wav_path
                 
                 self.logger.info(
-                    f"Speaker {speaker_id}: ref_audio extracted "
+                    f"Speaker {speaker_id}: ref_audio selected "
                     f"(score={best_score:.2f}, duration={best_seg['end']-best_seg['start']:.2f}s)"
                 )
             
+            extract_audio_segments(input_path, extractions)
+            
             return PhaseResult(
                 success=True,
                 output_files=output_files,
@@ -121,7 +156,7 @@ class RefAudioPhase(BasePhase):
             self.logger.error(f"ref_audio extraction failed: {e}")
             raise PhaseError(f"ref_audio抽出に失敗しました: {str(e)}")
     
-    def _score_ref_candidate(self, seg: dict, job: dict) -> float:
+    def _score_ref_candidate(self, seg: dict, neighbors: _NeighborIndex) -> float:
         """
         ref_audio候補スコアリング
         Design原則: 56. 可能性と確率を区別する - 稀な例を優先しすぎない
@@ -155,13 +190,8 @@ class RefAudioPhase(BasePhase):
             score *= 1.1
         
         # 5. 他話者混入チェック
-        segments = job['segments']
-        for other_seg in segments:
-            if other_seg['speaker_id'] != seg['speaker_id']:
-                if (abs(other_seg['start'] - seg['end']) < 0.5 or
-                    abs(other_seg['end'] - seg['start']) < 0.5):
-                    score *= 0.4
-                    break
+        if neighbors.has_other_speaker_near(seg['speaker_id'], seg['start'], seg['end']):
+            score *= 0.4
         
         # 6. suspected_hallucination
         if seg['flags'].get('suspected_hallucination'):
@@ -171,7 +201,7 @@ class RefAudioPhase(BasePhase):
     
     def validate_outputs(self, result: PhaseResult) -> None:
         """成果物検証"""
-        if "speakers" not in result.meta
+        if "speakers" not in result.metadata:
             raise PhaseError("speakers が更新されていません")
         
         # 少なくとも1話者はref_audioが存在するか
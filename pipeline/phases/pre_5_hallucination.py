@@ -3,12 +3,62 @@ Phase Pre-5: ハルシネーション判定
 Design原則: 56. 可能性と確率を区別する
 """
 from collections import Counter
+from functools import lru_cache
+from typing import Optional
 import re
 
+import ahocorasick
+
 from pipeline.base_phase import BasePhase, PhaseResult, PhaseError
-from app.services.storage import load_job
 from config.settings import settings
 
+_WORD_RE = re.compile(r'\w+')
+
+# 分かち書きしない言語（\w+だと文全体が1語になる）：かな・漢字は1文字ずつ、それ以外は語単位
+_CJK_LANGS = frozenset({"ja", "zh"})
+_CJK_TOKEN_RE = re.compile(r'[\u3040-\u30ff\u3400-\u9fff]|[^\W\u3040-\u30ff\u3400-\u9fff]+')
+
+# 定型句リスト（言語別）
+_COMMON_PHRASES = {
+    "ja": [
+        "ご視聴ありがとうございました",
+        "チャンネル登録",
+        "高評価",
+        "コメント欄",
+        "次回",
+        "字幕"
+    ],
+    "en": [
+        "thank you for watching",
+        "subscribe",
+        "like and subscribe",
+        "comment below",
+        "next video",
+        "subtitles"
+    ],
+    "zh": [
+        "感谢观看",
+        "订阅",
+        "点赞",
+        "评论",
+        "下一期"
+    ],
+    # 他言語は必要に応じて追加
+}
+
+@lru_cache(maxsize=None)
+def _common_phrase_automaton(lang: str) -> Optional[ahocorasick.Automaton]:
+    """定型句のAho-Corasickオートマトン（言語ごとに1回だけ構築、定型句がなければNone）"""
+    phrases = _COMMON_PHRASES.get(lang)
+    if not phrases:
+        return None
+    
+    automaton = ahocorasick.Automaton()
+    for phrase in phrases:
+        automaton.add_word(phrase, phrase)
+    automaton.make_automaton()
+    return automaton
+
 class HallucinationPhase(BasePhase):
     """
     ハルシネーション（幻聴）セグメントを検出
@@ -25,60 +75,63 @@ class HallucinationPhase(BasePhase):
     
     def validate_inputs(self) -> None:
         """入力検証"""
-        job = load_job(self.job_id)
+        job = self._get_job()
         if not job.get("segments"):
             raise PhaseError("segments が存在しません")
     
     def execute(self) -> PhaseResult:
         """ハルシネーション判定実行"""
-        job = load_job(self.job_id)
+        job = self._get_job()
         segments = job["segments"]
         src_lang = job["languages"]["src_lang"]
         
         try:
-            # 定型句リスト（言語別）
-            COMMON_PHRASES = self._get_common_phrases(src_lang)
+            # 定型句の照合器（言語別）
+            common_phrases = _common_phrase_automaton(src_lang)
             
             # 全セグメントのテキストを集計（TF-IDF風）
-            all_texts = [seg["src_text"].lower() for seg in segments]
+            # 単語をIDに置き換え、3-gramは文字列を作らず整数キーで数える
+            vocab: dict[str, int] = {}
+            segment_trigrams = []
             phrase_counter = Counter()
+            tokenize = (_CJK_TOKEN_RE if src_lang in _CJK_LANGS else _WORD_RE).findall
             
-            for text in all_texts:
-                # 3-gram以上のフレーズを抽出
-                words = re.findall(r'\w+', text)
-                for i in range(len(words) - 2):
-                    phrase = ' '.join(words[i:i+3])
-                    phrase_counter[phrase] += 1
+            for seg in segments:
+                ids = [
+                    vocab.setdefault(word, len(vocab))
+                    for word in tokenize(seg["src_text"].lower())
+                ]
+                trigrams = [
+                    (ids[i] << 42) | (ids[i + 1] << 21) | ids[i + 2]
+                    for i in range(len(ids) - 2)
+                ]
+                segment_trigrams.append(trigrams)
+                phrase_counter.update(trigrams)
             
             # 頻出フレーズ（全体の20%以上で出現）
             total_segs = len(segments)
             threshold = total_segs * 0.2
-            frequent_phrases = {
+            frequent_phrases = frozenset(
                 phrase for phrase, count in phrase_counter.items()
                 if count >= threshold
-            }
+            )
             
             self.logger.info(f"Detected {len(frequent_phrases)} frequent phrases (potential hallucinations)")
             
             # 各セグメントを判定
             hallucination_count = 0
             
-            for seg in segments:
+            for seg, trigrams in zip(segments, segment_trigrams):
                 text = seg["src_text"].lower()
                 is_hallucination = False
                 
-                # 1. 定型句チェック
-                for phrase in COMMON_PHRASES:
-                    if phrase in text:
-                        is_hallucination = True
-                        break
+                # 1. 定型句チェック（全定型句を1回の走査で照合、最初の一致で打ち切る）
+                if common_phrases is not None and next(common_phrases.iter(text), None) is not None:
+                    is_hallucination = True
                 
-                # 2. 頻出フレーズチェック
-                if not is_hallucination:
-                    for phrase in frequent_phrases:
-                        if phrase in text:
-                            is_hallucination = True
-                            break
+                # 2. 頻出フレーズチェック（このセグメントの3-gramとの共通部分）
+                if not is_hallucination and not frequent_phrases.isdisjoint(trigrams):
+                    is_hallucination = True
                 
                 # 3. 異常に短いセグメント（<2文字）
                 if len(seg["src_text"].strip()) < 2:
@@ -109,40 +162,9 @@ class HallucinationPhase(BasePhase):
             self.logger.error(f"Hallucination detection failed: {e}")
             raise PhaseError(f"ハルシネーション判定に失敗しました: {str(e)}")
     
-    def _get_common_phrases(self, lang: str) -> list[str]:
-        """言語別の定型句リスト"""
-        PHRASES = {
-            "ja": [
-                "ご視聴ありがとうございました",
-                "チャンネル登録",
-                "高評価",
-                "コメント欄",
-                "次回",
-                "字幕"
-            ],
-            "en": [
-                "thank you for watching",
-                "subscribe",
-                "like and subscribe",
-                "comment below",
-                "next video",
-                "subtitles"
-            ],
-            "zh": [
-                "感谢观看",
-                "订阅",
-                "点赞",
-                "评论",
-                "下一期"
-            ],
-            # 他言語は必要に応じて追加
-        }
-        
-        return PHRASES.get(lang, [])
-    
     def validate_outputs(self, result: PhaseResult) -> None:
         """成果物検証"""
-        if "segments" not in result.meta
+        if "segments" not in result.metadata:
             raise PhaseError("segments が更新されていません")
         
         # 全セグメントに suspected_hallucination が設定されているか
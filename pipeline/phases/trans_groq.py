@@ -1,16 +1,23 @@
 """
 Phase Translation v2（リファクタ版）
 """
+from typing import Optional
+
 from pipeline.base_phase import BasePhase, PhaseResult, PhaseError
 from pipeline.phase_dependencies import PhaseID
 from pipeline.utils.groq_client import GroqClient, GroqAPIError
 from pipeline.utils.chunker import SegmentChunker
-from app.services.storage import load_job
 from config.settings import settings
 
 class TranslationPhase(BasePhase):
     """Groq APIでセグメント一括翻訳 v2"""
     
+    def __init__(self, job_id: str):
+        super().__init__(job_id)
+        # 翻訳対象とチャンク分割の結果（get_timeoutとexecuteで共有、job単位）
+        self._plan_job: Optional[dict] = None
+        self._plan: tuple[list[dict], list[list[dict]]] = ([], [])
+    
     def get_phase_name(self) -> str:
         return "Translation"
     
@@ -18,24 +25,18 @@ class TranslationPhase(BasePhase):
         return PhaseID.TRANSLATION
     
     def get_timeout(self) -> int:
-        job = load_job(self.job_id)
-        segments = job.get("segments", [])
-        chunks = SegmentChunker.chunk_segments(segments)
+        _, chunks = self._translation_plan(self._get_job())
         # チャンク数 × 45秒（API呼び出し + レート制限待機）
         return max(1800, len(chunks) * 45)
     
     def execute(self) -> PhaseResult:
         """翻訳実行"""
-        job = load_job(self.job_id)
+        job = self._get_job()
         segments = job["segments"]
         src_lang = job["languages"]["src_lang"]
         tgt_lang = job["languages"]["tgt_lang"]
         
-        # ハルシネーションフラグのセグメントはスキップ
-        translatable_segments = [
-            seg for seg in segments
-            if not seg["flags"].get("suspected_hallucination", False)
-        ]
+        translatable_segments, chunks = self._translation_plan(job)
         
         if not translatable_segments:
             self.logger.warning("No segments to translate (all flagged)")
@@ -49,8 +50,6 @@ class TranslationPhase(BasePhase):
             # Groqクライアント初期化
             groq = GroqClient()
             
-            # チャンク分割
-            chunks = SegmentChunker.chunk_segments(translatable_segments)
             total_chunks = len(chunks)
             
             self.logger.info(
@@ -134,6 +133,24 @@ class TranslationPhase(BasePhase):
             
         except Exception as e:
             raise PhaseError(f"Translation phase failed: {str(e)}")
+    
+    def _translation_plan(self, job: dict) -> tuple[list[dict], list[list[dict]]]:
+        """
+        翻訳対象セグメントとチャンク分割（同じjobに対しては1回だけ計算）
+        ハルシネーションフラグのセグメントはスキップ
+        Design原則: 14. プリコンピュテーション
+        """
+        if self._plan_job is not job:
+            segments = job.get("segments", [])
+            # フラグはsegments[].flagsが正
+            translatable_segments = [
+                seg for seg in segments
+                if not seg["flags"].get("suspected_hallucination", False)
+            ]
+            self._plan = (translatable_segments, SegmentChunker.chunk_segments(translatable_segments))
+            self._plan_job = job
+        return self._plan
+
 
 def phase_translation(job_id: str) -> None:
     """Phase Translation 実行"""
@@ -3,13 +3,13 @@ Phase TTS: Qwen3-TTS 音声合成
 Design原則: 20. メジャーなタスクに最適化する
 """
 from pathlib import Path
+from typing import Optional
 import time
 
 from pipeline.base_phase import BasePhase, PhaseResult, PhaseError
 from pipeline.phase_dependencies import PhaseID
 from pipeline.utils.qwen_tts_client import QwenTTSClient, QwenTTSError
 from pipeline.utils.tts_validator import TTSValidator
-from app.services.storage import load_job
 from config.settings import settings
 
 class TTSPhase(BasePhase):
@@ -20,6 +20,12 @@ class TTSPhase(BasePhase):
     成果物: tts_output/{seg_id}.wav, segments[].tts.wav_path, segments[].timing.tts_duration
     """
     
+    def __init__(self, job_id: str):
+        super().__init__(job_id)
+        # 処理対象セグメント（get_timeoutとexecuteで共有、job単位）
+        self._processable_job: Optional[dict] = None
+        self._processable: list[dict] = []
+    
     def get_phase_name(self) -> str:
         return "TTS"
     
@@ -28,28 +34,17 @@ class TTSPhase(BasePhase):
     
     def get_timeout(self) -> int:
         # セグメント数 × 5分（CPU処理想定）
-        job = load_job(self.job_id)
-        segments = job.get("segments", [])
-        processable = [
-            seg for seg in segments
-            if seg["translation"]["status"] == "completed"
-            and not seg["flags"].get("suspected_hallucination", False)
-        ]
+        processable = self._processable_segments(self._get_job())
         return max(3600, len(processable) * settings.TIMEOUT_TTS_PER_SEGMENT)
     
     def execute(self) -> PhaseResult:
         """TTS実行"""
-        job = load_job(self.job_id)
+        job = self._get_job()
         segments = job["segments"]
         speakers = job["speakers"]
         tgt_lang = job["languages"]["tgt_lang"]
         
-        # 処理対象セグメント（翻訳完了 & 非ハルシネーション）
-        processable_segments = [
-            seg for seg in segments
-            if seg["translation"]["status"] == "completed"
-            and not seg["flags"].get("suspected_hallucination", False)
-        ]
+        processable_segments = self._processable_segments(job)
         
         if not processable_segments:
             self.logger.warning("No segments to synthesize")
@@ -87,17 +82,14 @@ class TTSPhase(BasePhase):
                 for spk in speakers
             }
             
-            # セグメント逐次処理（CPU負荷考慮）
-            for i, seg in enumerate(processable_segments, 1):
-                self.logger.progress(i, total_segs, f"Synthesizing segment {i}/{total_segs}")
-                
-                seg_id = seg["seg_id"]
-                text = seg["tgt_text"]
-                speaker_id = seg["speaker_id"]
-                
-                # 出力パス
-                output_path = tts_output_dir / f"{seg_id}.wav"
-                
+            # 話者ごとにまとめて処理（参照音声の読み込みは話者ごとに1回、クライアント側でキャッシュ）
+            segments_by_speaker: dict[str, list[dict]] = {}
+            for seg in processable_segments:
+                segments_by_speaker.setdefault(seg["speaker_id"], []).append(seg)
+            
+            done_count = 0
+            
+            for speaker_id, speaker_segments in segments_by_speaker.items():
                 # 話者のref_audio情報取得
                 speaker_ref = speaker_ref_map.get(speaker_id, {})
                 ref_audio_path = speaker_ref.get("ref_audio_path")
@@ -111,63 +103,39 @@ class TTSPhase(BasePhase):
                     ref_audio_path = None
                     ref_text = None
                 
-                try:
-                    # TTS合成
-                    start_time = time.time()
-                    
-                    duration = tts_client.synthesize(
-                        text=text,
-                        ref_audio_path=ref_audio_path,
-                        ref_text=ref_text,
-                        language=tgt_lang,
-                        output_path=output_path
-                    )
-                    
-                    synthesis_time = time.time() - start_time
-                    
-                    # 品質検証
-                    # 期待される長さ：元セグメント長の0.5〜2.5倍
-                    orig_duration = seg["end"] - seg["start"]
-                    expected_range = (orig_duration * 0.5, orig_duration * 2.5)
-                    
-                    is_valid, error_msg = TTSValidator.validate(
-                        audio_path=output_path,
-                        expected_duration_range=expected_range
-                    )
-                    
-                    if not is_valid:
-                        raise QwenTTSError(f"Quality validation failed: {error_msg}")
+                # セグメント逐次処理（CPU負荷考慮）
+                for seg in speaker_segments:
+                    done_count += 1
+                    self.logger.progress(done_count, total_segs, f"Synthesizing segment {done_count}/{total_segs}")
                     
-                    # セグメントに反映
-                    seg["tts"]["wav_path"] = str(output_path)
-                    seg["tts"]["status"] = "completed"
-                    seg["timing"]["tts_duration"] = duration
+                    output_path = tts_output_dir / f"{seg['seg_id']}.wav"
                     
-                    success_count += 1
-                    
-                    # RTF（Real-Time Factor）計算
-                    rtf = synthesis_time / duration if duration > 0 else 0
-                    
-                    self.logger.debug(
-                        f"Segment {seg_id} synthesized",
-                        duration=round(duration, 2),
-                        synthesis_time=round(synthesis_time, 2),
-                        rtf=round(rtf, 2)
-                    )
-                    
-                except QwenTTSError as e:
-                    self.logger.error(f"TTS failed for segment {seg_id}: {e}")
-                    
-                    failed_count += 1
-                    seg["tts"]["status"] = "failed"
-                    seg["tts"]["retries"] += 1
-                    
-                    # 失敗率が50%超えたら中断
-                    if failed_count / total_segs > 0.5:
-                        raise PhaseError(
-                            f"TTS failure rate too high: "
-                            f"{failed_count}/{total_segs} segments failed"
+                    try:
+                        # TTS合成
+                        start_time = time.time()
+                        duration = tts_client.synthesize(
+                            text=seg["tgt_text"],
+                            ref_audio_path=ref_audio_path,
+                            ref_text=ref_text,
+                            language=tgt_lang,
+                            output_path=output_path
                         )
+                        self._accept_segment(seg, output_path, duration, time.time() - start_time)
+                        success_count += 1
+                        
+                    except QwenTTSError as e:
+                        self.logger.error(f"TTS failed for segment {seg['seg_id']}: {e}")
+                        
+                        failed_count += 1
+                        seg["tts"]["status"] = "failed"
+                        seg["tts"]["retries"] += 1
+                        
+                        # 失敗率が50%超えたら中断
+                        if failed_count / total_segs > 0.5:
+                            raise PhaseError(
+                                f"TTS failure rate too high: "
+                                f"{failed_count}/{total_segs} segments failed"
+                            )
             
             # モデルをメモリから解放
             tts_client.unload_model()
@@ -194,6 +162,59 @@ class TTSPhase(BasePhase):
             
             raise PhaseError(f"TTS phase failed: {str(e)}")
 
+    def _processable_segments(self, job: dict) -> list[dict]:
+        """
+        処理対象セグメント（翻訳完了 & 非ハルシネーション）
+        同じjobに対しては1回だけ走査する
+        """
+        if self._processable_job is not job:
+            self._processable = [
+                seg for seg in job.get("segments", [])
+                if seg["translation"]["status"] == "completed"
+                and not seg["flags"].get("suspected_hallucination", False)
+            ]
+            self._processable_job = job
+        return self._processable
+    
+    def _accept_segment(
+        self,
+        seg: dict,
+        output_path: Path,
+        duration: float,
+        synthesis_time: float
+    ) -> None:
+        """
+        合成結果の品質検証とセグメントへの反映
+        Raises: QwenTTSError（品質検証NG）
+        """
+        # 品質検証
+        # 期待される長さ：元セグメント長の0.5〜2.5倍
+        orig_duration = seg["end"] - seg["start"]
+        expected_range = (orig_duration * 0.5, orig_duration * 2.5)
+        
+        is_valid, error_msg = TTSValidator.validate(
+            audio_path=output_path,
+            expected_duration_range=expected_range
+        )
+        
+        if not is_valid:
+            raise QwenTTSError(f"Quality validation failed: {error_msg}")
+        
+        # セグメントに反映
+        seg["tts"]["wav_path"] = str(output_path)
+        seg["tts"]["status"] = "completed"
+        seg["timing"]["tts_duration"] = duration
+        
+        # RTF（Real-Time Factor）計算
+        rtf = synthesis_time / duration if duration > 0 else 0
+        
+        self.logger.debug(
+            f"Segment {seg['seg_id']} synthesized",
+            duration=round(duration, 2),
+            synthesis_time=round(synthesis_time, 2),
+            rtf=round(rtf, 2)
+        )
+
 def phase_tts(job_id: str) -> None:
     """Phase TTS 実行"""
     phase = TTSPhase(job_id)
@@ -3,17 +3,29 @@ Celeryタスク定義（リファクタ版）
 Design原則: 2. 簡単にする - 手数を減らす
 """
 import logging
+import time
 from celery import Task
-from datetime import datetime, timedelta
+from celery.signals import worker_shutting_down
+from datetime import datetime
 
 from app.services.job_queue import celery_app
 from app.services.storage import load_job, save_job, update_job_status
-from app.services.notification import send_job_completed_email, send_job_failed_email
+from app.services.notification import send_job_completed_email_sync, send_job_failed_email_sync
+from pipeline.base_phase import shutdown_requested
 from pipeline.orchestrator import PipelineOrchestrator, PipelineConfig
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+@worker_shutting_down.connect
+def _abandon_phase_retries(**kwargs):
+    """
+    ワーカー停止時はPhaseのリトライ待機を即座に終える
+    このシグナルはメインプロセスでのみ発火するため、ワーカーは --pool=solo で起動する
+    （preforkでは子プロセスのshutdown_requestedがセットされない）
+    """
+    shutdown_requested.set()
+
 class JobTask(Task):
     """カスタムタスククラス"""
     
@@ -25,7 +37,7 @@ class JobTask(Task):
             update_job_status(job_id, "FAILED", error=str(exc))
             
             job = load_job(job_id)
-            send_job_failed_email(
+            send_job_failed_email_sync(
                 job_id=job_id,
                 email=job["user_email"],
                 error_message=str(exc)
@@ -56,8 +68,7 @@ def process_job_task(self, job_id: str):
                 SeparatePhase,
                 WhisperXPhase,
                 VADPhase,
-                RefAudioPhase,
-                HallucinationPhase,
+                (RefAudioPhase, HallucinationPhase),  # 互いの成果物を読まないので並行
                 TranslationPhase,  # 追加
                 # TTSPhase,  # 次回
                 # ... (Post処理)
@@ -84,14 +95,13 @@ def process_job_task(self, job_id: str):
         job = load_job(job_id)
         job["status"] = "COMPLETED"
         job["current_phase"] = None
-        job["expires_at"] = (
-            datetime.utcnow() + timedelta(hours=settings.DELIVERY_RETENTION_HOURS)
-        ).isoformat() + "Z"
+        job["expires_at_ts"] = int(time.time()) + settings.DELIVERY_RETENTION_HOURS * 3600
+        job["expires_at"] = datetime.utcfromtimestamp(job["expires_at_ts"]).isoformat() + "Z"
         save_job(job)
         
         # 完了メール送信
         download_url = f"{settings.PUBLIC_URL}/status/{job_id}"
-        send_job_completed_email(
+        send_job_completed_email_sync(
             job_id=job_id,
             email=job["user_email"],
             download_url=download_url,
@@ -53,7 +53,7 @@ class GroqClient:
         max_retries = max_retries or settings.GROQ_MAX_RETRIES
         
         # キャッシュチェック
-        cached = translation_cache.get(texts, src_lang, tgt_lang)
+        cached = translation_cache.get(texts, src_lang, tgt_lang, context)
         if cached:
             self.stats["cache_hits"] += 1
             logger.info(f"Translation cache hit for {len(texts)} segments")
@@ -111,7 +111,7 @@ class GroqClient:
                     )
                 
                 # キャッシュ保存
-                translation_cache.set(texts, src_lang, tgt_lang, translations)
+                translation_cache.set(texts, src_lang, tgt_lang, translations, context)
                 
                 return translations
                 
@@ -247,7 +247,7 @@ IMPORTANT: Return pure JSON without markdown code blocks or extra text."""
         try:
             data = json.loads(content)
             
-            if "translations" not in 
+            if "translations" not in data:
                 raise GroqAPIError("Response missing 'translations' field")
             
             translations_list = data["translations"]
@@ -19,6 +19,9 @@ class StructuredLogger:
     
     def _log(self, level: int, message: str, **extra):
         """構造化ログ出力"""
+        # 出力されないレベルではJSON化しない（debugは本番で大半が捨てられる）
+        if not self.logger.isEnabledFor(level):
+            return
         log_data = {
             "job_id": self.job_id,
             "phase": self.phase_name,
@@ -0,0 +1,30 @@
+"""
+pre_voice の生サンプル共有（Pre-2 → Pre-3 / Pre-3.5）
+Design原則: 14. プリコンピュテーション - デコード済みの波形を使い回す
+"""
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+# Pre-2が書き出す pre_voice.wav と同じ形式（16kHzモノラル）のfloat32生データ
+PRE_VOICE_RAW = "pre_voice.f32"
+PRE_VOICE_SAMPLE_RATE = 16000
+
+
+def save_pre_voice_samples(temp_dir: Path, samples: np.ndarray) -> Path:
+    """16kHzモノラルの波形をヘッダなしfloat32で保存"""
+    raw_path = temp_dir / PRE_VOICE_RAW
+    np.ascontiguousarray(samples, dtype=np.float32).tofile(raw_path)
+    return raw_path
+
+
+def load_pre_voice_samples(temp_dir: Path) -> Optional[np.ndarray]:
+    """
+    保存済みの波形を読み込む（デコード・リサンプル不要）
+    Returns: float32の1次元配列、未作成ならNone（呼び出し側でwavをデコードする）
+    """
+    raw_path = temp_dir / PRE_VOICE_RAW
+    if not raw_path.exists():
+        return None
+    return np.fromfile(raw_path, dtype=np.float32)
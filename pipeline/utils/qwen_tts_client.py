@@ -31,6 +31,9 @@ class QwenTTSClient:
         
         # モデルは遅延ロード（メモリ節約）
         self._model_loaded = False
+        
+        # 直前に読み込んだ参照音声（同じ話者の連続合成で読み直さない）
+        self._ref_audio_cache: tuple[Optional[Path], Optional[torch.Tensor]] = (None, None)
     
     def _load_model(self):
         """モデル遅延ロード"""
@@ -81,23 +84,8 @@ class QwenTTSClient:
         self._load_model()
         
         try:
-            # 参照音声読み込み（話者クローニング）
-            if ref_audio_path and ref_audio_path.exists():
-                ref_audio, ref_sr = torchaudio.load(str(ref_audio_path))
-                
-                # リサンプリング（Qwen3-TTSの要求レートに合わせる）
-                if ref_sr != self.sample_rate:
-                    resampler = torchaudio.transforms.Resample(ref_sr, self.sample_rate)
-                    ref_audio = resampler(ref_audio)
-                
-                # モノラル化
-                if ref_audio.shape[0] > 1:
-                    ref_audio = ref_audio.mean(dim=0, keepdim=True)
-                
-                ref_audio = ref_audio.to(self.device)
-            else:
-                # 参照音声なし（プリセットボイス使用）
-                ref_audio = None
+            ref_audio = self._load_ref_audio(ref_audio_path)
+            if ref_audio is None:
                 ref_text = None
             
             # テキスト前処理（記号正規化等）
@@ -113,26 +101,55 @@ class QwenTTSClient:
                     speed=1.0
                 )
             
-            # CPU上のテンソルをnumpy配列に変換
-            if isinstance(output_audio, torch.Tensor):
-                output_audio = output_audio.cpu().numpy()
-            
-            # wavファイル保存
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            torchaudio.save(
-                str(output_path),
-                torch.from_numpy(output_audio).unsqueeze(0),
-                self.sample_rate
-            )
-            
-            # 生成音声の長さを計算
-            duration = output_audio.shape[-1] / self.sample_rate
-            
-            return duration
+            return self._save_audio(output_audio, output_path)
             
         except Exception as e:
             raise QwenTTSError(f"TTS synthesis failed: {str(e)}")
     
+    def _load_ref_audio(self, ref_audio_path: Optional[Path]) -> Optional[torch.Tensor]:
+        """
+        参照音声読み込み（話者クローニング）、なければNone（プリセットボイス使用）
+        直前と同じパスなら読み込み済みのテンソルを返す（話者ごとにまとめて呼ぶと読み込みは1回）
+        """
+        if not ref_audio_path or not ref_audio_path.exists():
+            return None
+        
+        cached_path, cached_audio = self._ref_audio_cache
+        if cached_path == ref_audio_path:
+            return cached_audio
+        
+        ref_audio, ref_sr = torchaudio.load(str(ref_audio_path))
+        
+        # リサンプリング（Qwen3-TTSの要求レートに合わせる）
+        if ref_sr != self.sample_rate:
+            resampler = torchaudio.transforms.Resample(ref_sr, self.sample_rate)
+            ref_audio = resampler(ref_audio)
+        
+        # モノラル化
+        if ref_audio.shape[0] > 1:
+            ref_audio = ref_audio.mean(dim=0, keepdim=True)
+        
+        ref_audio = ref_audio.to(self.device)
+        self._ref_audio_cache = (ref_audio_path, ref_audio)
+        return ref_audio
+    
+    def _save_audio(self, output_audio, output_path: Path) -> float:
+        """生成音声をwavで保存し、長さ（秒）を返す"""
+        # CPU上のテンソルをnumpy配列に変換
+        if isinstance(output_audio, torch.Tensor):
+            output_audio = output_audio.cpu().numpy()
+        
+        # wavファイル保存
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        torchaudio.save(
+            str(output_path),
+            torch.from_numpy(output_audio).unsqueeze(0),
+            self.sample_rate
+        )
+        
+        # 生成音声の長さを計算
+        return output_audio.shape[-1] / self.sample_rate
+    
     def _preprocess_text(self, text: str, language: str) -> str:
         """
         テキスト前処理
@@ -171,6 +188,7 @@ class QwenTTSClient:
             del self.model
             self.model = None
             self._model_loaded = False
+            self._ref_audio_cache = (None, None)
             
             # 明示的なガベージコレクション
             gc.collect()
@@ -3,11 +3,11 @@ Groq APIレート制限管理
 Design原則: 15. エラーを回避する
 """
 import time
-import redis
 from datetime import datetime, timedelta
 from typing import Optional
 
 from config.settings import settings
+from app.services.redis_client import redis_client
 
 class RateLimiter:
     """
@@ -16,10 +16,7 @@ class RateLimiter:
     """
     
     def __init__(self):
-        self.redis = redis.from_url(
-            settings.CELERY_BROKER_URL,
-            decode_responses=True
-        )
+        self.redis = redis_client
         self.prefix = "talkdub:rate_limit:groq"
         self.rpm_limit = int(settings.GROQ_RATE_LIMIT_RPM * settings.GROQ_RATE_LIMIT_BUFFER)
     
@@ -0,0 +1,55 @@
+"""
+Silero VADモデルの読み込み（プロセス内で1回、先読み可能）
+Design原則: 14. プリコンピュテーション - 前のPhaseの間に読み込んでおく
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+import silero_vad
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="silero-vad")
+_future: Optional[Future] = None
+_lock = threading.Lock()
+
+
+def _load() -> tuple[Any, Callable]:
+    """
+    silero-vadパッケージ同梱のモデルを読み込む（torch.hubのGitHub参照・キャッシュロックなし）
+    ONNX版（onnxruntime実行）を使う。窓ごとのPython/torchディスパッチが軽く、
+    get_speech_timestamps の呼び出し方はPyTorch版と同じ
+    """
+    return silero_vad.load_silero_vad(onnx=True), silero_vad.get_speech_timestamps
+
+
+def new_silero_vad_model() -> Any:
+    """
+    追加のモデルインスタンス（キャッシュしない）
+    モデルは推論中の内部状態を持つため、並行実行ではスレッドごとに別インスタンスを使う
+    """
+    return silero_vad.load_silero_vad(onnx=True)
+
+
+def prefetch_silero_vad() -> Future:
+    """バックグラウンドで読み込みを開始（読み込み済み・読み込み中なら何もしない）"""
+    global _future
+    with _lock:
+        if _future is None:
+            _future = _executor.submit(_load)
+        return _future
+
+
+def load_silero_vad() -> tuple[Any, Callable]:
+    """
+    (model, get_speech_timestamps) を取得（先読み済みならその結果を待つ）
+    失敗した場合は次の呼び出しで読み込み直す
+    """
+    global _future
+    future = prefetch_silero_vad()
+    try:
+        return future.result()
+    except Exception:
+        with _lock:
+            if _future is future:
+                _future = None
+        raise
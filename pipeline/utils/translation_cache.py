@@ -3,12 +3,12 @@
 Design原則: 14. プリコンピュテーション
 """
 import hashlib
-import json
-import redis
+import orjson
 from typing import Optional, List
 from datetime import timedelta
 
 from config.settings import settings
+from app.services.redis_client import redis_client
 
 class TranslationCache:
     """
@@ -17,10 +17,7 @@ class TranslationCache:
     """
     
     def __init__(self):
-        self.redis = redis.from_url(
-            settings.CELERY_BROKER_URL,
-            decode_responses=True
-        )
+        self.redis = redis_client
         self.prefix = "talkdub:translation_cache"
         self.enabled = settings.TRANSLATION_CACHE_ENABLED
         self.ttl = timedelta(hours=settings.TRANSLATION_CACHE_TTL_HOURS)
@@ -29,10 +26,12 @@ class TranslationCache:
         self,
         texts: List[str],
         src_lang: str,
-        tgt_lang: str
+        tgt_lang: str,
+        context: Optional[str] = None
     ) -> Optional[List[str]]:
         """
         キャッシュから翻訳取得
+        （同じチャンクの再翻訳：Phaseのリトライ・ジョブの再実行でAPIを呼ばない）
         
         Returns:
             キャッシュヒット時は翻訳リスト、ミス時はNone
@@ -40,12 +39,12 @@ class TranslationCache:
         if not self.enabled:
             return None
         
-        cache_key = self._generate_key(texts, src_lang, tgt_lang)
+        cache_key = self._generate_key(texts, src_lang, tgt_lang, context)
         
         try:
             cached = self.redis.get(cache_key)
             if cached:
-                return json.loads(cached)
+                return orjson.loads(cached)
         except Exception:
             pass
         
@@ -56,19 +55,20 @@ class TranslationCache:
         texts: List[str],
         src_lang: str,
         tgt_lang: str,
-        translations: List[str]
+        translations: List[str],
+        context: Optional[str] = None
     ) -> None:
         """キャッシュに翻訳を保存"""
         if not self.enabled:
             return
         
-        cache_key = self._generate_key(texts, src_lang, tgt_lang)
+        cache_key = self._generate_key(texts, src_lang, tgt_lang, context)
         
         try:
             self.redis.setex(
                 cache_key,
                 int(self.ttl.total_seconds()),
-                json.dumps(translations, ensure_ascii=False)
+                orjson.dumps(translations)
             )
         except Exception:
             pass  # キャッシュ失敗は致命的ではない
@@ -77,15 +77,20 @@ class TranslationCache:
         self,
         texts: List[str],
         src_lang: str,
-        tgt_lang: str
+        tgt_lang: str,
+        context: Optional[str]
     ) -> str:
-        """キャッシュキー生成"""
-        # テキスト群をハッシュ化
-        text_hash = hashlib.sha256(
-            json.dumps(texts, ensure_ascii=False, sort_keys=True).encode()
-        ).hexdigest()[:16]
+        """
+        キャッシュキー生成
+        文脈（動画タイトル）はプロンプトに入り訳文が変わるため、キーに含める
+        """
+        # 文脈とテキスト群を区切り文字（US）でつないでハッシュ化
+        text_hash = hashlib.blake2b(
+            "\x1f".join([context or "", *texts]).encode(),
+            digest_size=16
+        ).hexdigest()
         
-        return f"{self.prefix}:{src_lang}:{tgt_lang}:{text_hash}"
+        return f"{self.prefix}:v2:{src_lang}:{tgt_lang}:{text_hash}"
     
     def get_stats(self) -> dict:
         """キャッシュ統計情報取得（監視用）"""
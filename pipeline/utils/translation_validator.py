@@ -6,10 +6,16 @@ import re
 import logging
 from typing import List, Tuple
 
-from config.settings import settings
+from config.settings import settings, TRANSLATION_SUSPICIOUS_RES
 
 logger = logging.getLogger(__name__)
 
+# セグメントごとに使う正規表現は一度だけコンパイル
+_SYMBOLS_ONLY_RE = re.compile(r'^[\s\W]+$')
+
+# 漢字・かなを本来含む翻訳先（不審パターンのうち文字種のチェックが誤検知になる）
+_CJK_TARGET_LANGS = frozenset({"ja", "zh"})
+
 class TranslationValidator:
     """
     翻訳結果の品質検証
@@ -53,15 +59,17 @@ class TranslationValidator:
                     f"(ratio={length_ratio:.2f})"
                 )
             
-            # 3. 元言語混入チェック（日本語→英語の場合）
-            if src_lang == "ja" and tgt_lang == "en":
-                if re.search(r'[\u3040-\u309f\u30a0-\u30ff\u4e00-\u9fff]', trans):
-                    warnings.append(
-                        f"[WARNING] Segment {i}: Japanese characters remain in English translation"
-                    )
+            # 3. 不審パターン（未翻訳の記号、漢字・かなの残り）。翻訳先がCJKなら対象外
+            if tgt_lang not in _CJK_TARGET_LANGS:
+                for pattern in TRANSLATION_SUSPICIOUS_RES:
+                    if pattern.search(trans):
+                        warnings.append(
+                            f"[WARNING] Segment {i}: Suspicious pattern {pattern.pattern!r} "
+                            f"in translation"
+                        )
             
             # 4. 記号のみチェック
-            if re.match(r'^[\s\W]+$', trans):
+            if _SYMBOLS_ONLY_RE.match(trans):
                 warnings.append(
                     f"[WARNING] Segment {i}: Translation contains only symbols/whitespace"
                 )
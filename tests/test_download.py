@@ -0,0 +1,107 @@
+"""
+納品物ダウンロード テストケース
+Design原則: 89. ユーザーが学習できるようにする
+"""
+import io
+import os
+import time
+import zipfile
+
+import pytest
+
+from app.api.download import (
+    delivery_etag, delivery_text_entries, etag_matches,
+    open_delivery_files, stream_delivery_zip
+)
+
+
+@pytest.fixture
+def delivery(tmp_path):
+    """成果物を置いたoutput_dirとjob"""
+    (tmp_path / "dub_en.wav").write_bytes(os.urandom(600 * 1024))
+    (tmp_path / "manifest.json").write_text('{"segments": 3}')
+    job = {
+        "job_id": "job-0001",
+        "created_at": "2026-01-01T00:00:00Z",
+        "created_at_ts": 1767225600,
+        "source": {"video_id": "abc", "url": "https://youtu.be/abc"},
+        "languages": {"src_lang": "ja", "tgt_lang": "en"},
+        "outputs": {"dub_wav": "dub_en.wav", "manifest_json": "manifest.json", "segments_json": None}
+    }
+    return tmp_path, job
+
+
+def _build(output_dir, job) -> tuple[str, bytes]:
+    """ETagとZIP全体を取得"""
+    files = open_delivery_files(output_dir, job)
+    text_entries = delivery_text_entries(job)
+    etag = delivery_etag(job["job_id"], files, text_entries)
+    return etag, b"".join(stream_delivery_zip(files, text_entries))
+
+
+class TestDeliveryZip:
+    """ストリーミングZIPとETag"""
+
+    def test_zip_contents(self, delivery):
+        """成果物と手順書・READMEが壊れずに入る"""
+        output_dir, job = delivery
+        _, data = _build(output_dir, job)
+
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            assert zf.testzip() is None
+            assert zf.namelist() == ["dub_en.wav", "manifest.json", "UPLOAD_GUIDE.txt", "README.txt"]
+            assert zf.read("dub_en.wav") == (output_dir / "dub_en.wav").read_bytes()
+            assert zf.read("manifest.json") == b'{"segments": 3}'
+
+    def test_bytes_are_stable(self, delivery, monkeypatch):
+        """時刻・タイムゾーンが変わっても同じETag・同じバイト列"""
+        output_dir, job = delivery
+        # 2026-01-01T20:00:00Z（東京では翌日になる時刻）に固定
+        mtime_ns = 1767297600 * 1_000_000_000
+        os.utime(output_dir / "dub_en.wav", ns=(mtime_ns, mtime_ns))
+
+        monkeypatch.setenv("TZ", "UTC")
+        time.tzset()
+        first = _build(output_dir, job)
+
+        # 1時間後に同じ成果物をダウンロード
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now + 3600)
+        monkeypatch.setenv("TZ", "Asia/Tokyo")
+        time.tzset()
+        second = _build(output_dir, job)
+
+        monkeypatch.delenv("TZ")
+        time.tzset()
+        assert first == second
+
+    def test_etag_changes_with_output(self, delivery):
+        """成果物が変わればETagも変わる"""
+        output_dir, job = delivery
+        before, _ = _build(output_dir, job)
+
+        (output_dir / "manifest.json").write_text('{"segments": 4}')
+        after, _ = _build(output_dir, job)
+
+        assert before != after
+
+
+class TestEtagMatches:
+    """If-None-Match判定"""
+
+    ETAG = '"0123456789abcdef"'
+
+    @pytest.mark.parametrize("header, expected", [
+        ('"0123456789abcdef"', True),
+        ('W/"0123456789abcdef"', True),
+        ('"other", "0123456789abcdef"', True),
+        ('*', True),
+        ('"other"', False),
+        ('', False),
+        (None, False),
+    ])
+    def test_header_forms(self, header, expected):
+        assert etag_matches(header, self.ETAG) is expected
+
+# 実行方法:
+# pytest tests/test_download.py -v
@@ -0,0 +1,46 @@
+"""
+ハルシネーション判定 テストケース
+Design原則: 89. ユーザーが学習できるようにする
+"""
+from pipeline.phases.pre_5_hallucination import _CJK_TOKEN_RE, _WORD_RE
+
+
+def _trigrams(tokens: list[str]) -> set[tuple[str, ...]]:
+    return {tuple(tokens[i:i + 3]) for i in range(len(tokens) - 2)}
+
+
+class TestCJKTokenizer:
+    """日本語・中国語の3-gram用トークン分割"""
+
+    def test_japanese_is_split_per_character(self):
+        """かな・漢字は1文字ずつ（\\w+だと文全体が1語になる）"""
+        assert _CJK_TOKEN_RE.findall("今日はいい天気ですね") == [
+            "今", "日", "は", "い", "い", "天", "気", "で", "す", "ね"
+        ]
+        assert _WORD_RE.findall("今日はいい天気ですね") == ["今日はいい天気ですね"]
+
+    def test_latin_words_stay_whole(self):
+        """混在する英数字は語単位のまま"""
+        assert _CJK_TOKEN_RE.findall("iphone15を買った") == ["iphone15", "を", "買", "っ", "た"]
+
+    def test_punctuation_is_dropped(self):
+        """句読点・記号はトークンにしない"""
+        assert _CJK_TOKEN_RE.findall("字幕：ありがとう。") == ["字", "幕", "あ", "り", "が", "と", "う"]
+        assert _CJK_TOKEN_RE.findall("你好，世界") == ["你", "好", "世", "界"]
+
+    def test_katakana_long_vowel_mark(self):
+        """長音記号もカタカナと同じく1文字"""
+        assert _CJK_TOKEN_RE.findall("カタカナー") == ["カ", "タ", "カ", "ナ", "ー"]
+
+    def test_repeated_phrase_shares_trigrams(self):
+        """文中に埋もれた同じ言い回しが共通の3-gramになる（\\w+では文ごとに1語で一致しない）"""
+        first = "今日もご視聴ありがとうございました"
+        second = "最後までご視聴ありがとう"
+
+        shared = _trigrams(_CJK_TOKEN_RE.findall(first)) & _trigrams(_CJK_TOKEN_RE.findall(second))
+        assert ("視", "聴", "あ") in shared
+
+        assert _trigrams(_WORD_RE.findall(first)) == set()
+
+# 実行方法:
+# pytest tests/test_hallucination.py -v
@@ -0,0 +1,45 @@
+"""
+正規化 Phase テストケース
+Design原則: 89. ユーザーが学習できるようにする
+"""
+import pytest
+
+from pipeline.phases.pre_1_normalize import (
+    MAX_GAIN_DB, _INTEGRATED_LOUDNESS_RE, _TRUE_PEAK_RE, _normalization_gain
+)
+
+# 無音入力に対するebur128のSummary
+SILENT_SUMMARY = """
+  Integrated loudness:
+    I:         -70.0 LUFS
+    Threshold:   0.0 LU
+
+  True peak:
+    Peak:       -inf dBFS
+"""
+
+
+class TestNormalizationGain:
+    """_normalization_gain単体テスト"""
+
+    def test_silent_summary_is_parsed(self):
+        """-infのピークも読み取れる"""
+        assert _INTEGRATED_LOUDNESS_RE.findall(SILENT_SUMMARY) == ["-70.0"]
+        assert _TRUE_PEAK_RE.findall(SILENT_SUMMARY) == ["-inf"]
+
+    @pytest.mark.parametrize("integrated", [float("-inf"), -70.0])
+    def test_silent_input_is_skipped(self, integrated):
+        """無音ならゲインをかけない"""
+        assert _normalization_gain(integrated, float("-inf")) is None
+
+    def test_gain_is_clamped(self):
+        """ほぼ無音でもMAX_GAIN_DBまで"""
+        assert _normalization_gain(-65.0, None) == MAX_GAIN_DB
+
+    def test_true_peak_limits_gain(self):
+        """トゥルーピークが上限を超えない範囲に抑える"""
+        assert _normalization_gain(-30.0, -1.0) == -1.0
+        assert _normalization_gain(-30.0, float("-inf")) == 7.0
+
+# 実行方法:
+# pytest tests/test_normalize.py -v
@@ -0,0 +1,67 @@
+"""
+ref_audio Phase テストケース
+Design原則: 89. ユーザーが学習できるようにする
+"""
+import random
+
+import pytest
+
+from pipeline.phases.pre_4_ref_audio import _NeighborIndex
+
+
+def _has_neighbor_scan(segments: list[dict], seg: dict) -> bool:
+    """旧実装（全セグメントを走査）"""
+    for other_seg in segments:
+        if other_seg['speaker_id'] != seg['speaker_id']:
+            if (abs(other_seg['start'] - seg['end']) < 0.5 or
+                abs(other_seg['end'] - seg['start']) < 0.5):
+                return True
+    return False
+
+
+class TestNeighborIndex:
+    """_NeighborIndex単体テスト"""
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_matches_full_scan(self, seed):
+        """ランダムなセグメントで旧実装と一致"""
+        rng = random.Random(seed)
+        segments = []
+        for _ in range(rng.randint(1, 80)):
+            start = round(rng.uniform(0, 120), 2)
+            segments.append({
+                'start': start,
+                'end': round(start + rng.uniform(0.1, 6), 2),
+                'speaker_id': rng.choice(["SPEAKER_00", "SPEAKER_01", "SPEAKER_02"])
+            })
+
+        neighbors = _NeighborIndex(segments)
+
+        for seg in segments:
+            assert neighbors.has_other_speaker_near(
+                seg['speaker_id'], seg['start'], seg['end']
+            ) == _has_neighbor_scan(segments, seg)
+
+    def test_same_speaker_is_ignored(self):
+        """同じ話者が接していても混入とみなさない"""
+        segments = [
+            {'start': 0.0, 'end': 2.0, 'speaker_id': "SPEAKER_00"},
+            {'start': 2.1, 'end': 4.0, 'speaker_id': "SPEAKER_00"},
+        ]
+
+        assert not _NeighborIndex(segments).has_other_speaker_near("SPEAKER_00", 0.0, 2.0)
+
+    def test_window_is_exclusive(self):
+        """ちょうど0.5秒離れていれば混入とみなさない"""
+        segments = [
+            {'start': 0.0, 'end': 2.0, 'speaker_id': "SPEAKER_00"},
+            {'start': 2.5, 'end': 4.0, 'speaker_id': "SPEAKER_01"},
+        ]
+        assert _NeighborIndex(segments).has_other_speaker_near("SPEAKER_01", 2.5, 4.0) is False
+
+        # 終了0.4秒後に別話者が始まる
+        segments.append({'start': 4.4, 'end': 5.0, 'speaker_id': "SPEAKER_02"})
+        assert _NeighborIndex(segments).has_other_speaker_near("SPEAKER_01", 2.5, 4.0) is True
+
+# 実行方法:
+# pytest tests/test_ref_audio.py -v
@@ -0,0 +1,163 @@
+"""
+ストレージ テストケース
+Design原則: 89. ユーザーが学習できるようにする
+"""
+import threading
+from unittest.mock import Mock
+
+import orjson
+import pytest
+
+from app.services import storage
+
+
+class FakeRedis:
+    """SET NX EX / GET / DELETE だけを持つRedisの代役（期限は扱わない）"""
+
+    def __init__(self):
+        self.data = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def delete(self, key):
+        return 1 if self.data.pop(key, None) is not None else 0
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(storage, "_redis", fake)
+    return fake
+
+
+@pytest.fixture
+def job_store(tmp_path, monkeypatch, fake_redis):
+    """job.jsonとインデックスをtmp_pathに置く"""
+    monkeypatch.setattr(storage, "JOB_INDEX_PATH", tmp_path / "jobs.sqlite3")
+    monkeypatch.setattr(storage, "_index_local", threading.local())
+    monkeypatch.setattr(storage, "paths_for", lambda job_id: storage.JobPaths(
+        job_json=tmp_path / f"{job_id}.json",
+        ref_dir=tmp_path / "ref" / job_id,
+        output_dir=tmp_path / "output" / job_id,
+        temp_dir=tmp_path / "temp" / job_id,
+        log_dir=tmp_path / "logs" / job_id,
+    ))
+    return tmp_path
+
+
+def _new_job(job_id: str = "job-0001") -> dict:
+    return {
+        "job_id": job_id,
+        "created_at": "2026-01-01T00:00:00Z",
+        "created_at_ts": 1767225600,
+        "status": "QUEUED",
+        "current_phase": None,
+        "source": {"video_id": "abc"},
+        "error": None,
+        "expires_at": None,
+        "expires_at_ts": None
+    }
+
+
+class TestClaimVideo:
+    """claim_video / release_video 単体テスト"""
+
+    def test_first_claim_wins(self, fake_redis):
+        """同じvideo_idは最初のjob_idだけが予約できる"""
+        assert storage.claim_video("abc", "job-1") is None
+        assert storage.claim_video("abc", "job-2") == "job-1"
+
+    def test_release_only_by_owner(self, fake_redis):
+        """予約していないjob_idでは解除されない"""
+        storage.claim_video("abc", "job-1")
+
+        storage.release_video("abc", "job-2")
+        assert storage.claim_video("abc", "job-3") == "job-1"
+
+        storage.release_video("abc", "job-1")
+        assert storage.claim_video("abc", "job-3") is None
+
+    def test_claim_retries_when_key_expires(self, monkeypatch):
+        """SET NXとGETの間に期限切れになったら予約し直す"""
+        redis_mock = Mock()
+        redis_mock.set.side_effect = [None, True]
+        redis_mock.get.return_value = None
+        monkeypatch.setattr(storage, "_redis", redis_mock)
+
+        assert storage.claim_video("abc", "job-1") is None
+        assert redis_mock.set.call_count == 2
+
+
+class TestUpdateJobStatus:
+    """update_job_status と load_job の重ね合わせ"""
+
+    def test_in_progress_update_is_index_only(self, job_store):
+        """進行中の更新はjob.jsonを書き直さず、load_jobには反映される"""
+        storage.save_job(_new_job())
+
+        storage.update_job_status("job-0001", "PROCESSING", current_phase="Pre-1: Normalize")
+
+        on_disk = orjson.loads((job_store / "job-0001.json").read_bytes())
+        assert on_disk["status"] == "QUEUED"
+
+        job = storage.load_job("job-0001")
+        assert job["status"] == "PROCESSING"
+        assert job["current_phase"] == "Pre-1: Normalize"
+
+    def test_none_clears_and_omitted_keeps(self, job_store):
+        """Noneは消去、省略は現状維持"""
+        job = _new_job()
+        job["current_phase"] = "Pre-2: Separate"
+        job["error"] = "previous error"
+        storage.save_job(job)
+
+        storage.update_job_status("job-0001", "PROCESSING", current_phase=None)
+
+        job = storage.load_job("job-0001")
+        assert job["current_phase"] is None
+        assert job["error"] == "previous error"
+
+    def test_terminal_update_writes_job_json(self, job_store):
+        """終了状態はjob.jsonまで書き出す"""
+        storage.save_job(_new_job())
+        storage.update_job_status("job-0001", "PROCESSING", current_phase="Translation")
+
+        storage.update_job_status("job-0001", "FAILED", error="boom")
+
+        on_disk = orjson.loads((job_store / "job-0001.json").read_bytes())
+        assert on_disk["status"] == "FAILED"
+        assert on_disk["current_phase"] == "Translation"
+        assert on_disk["error"] == "boom"
+
+
+class TestJobCache:
+    """job.jsonの共有キャッシュ"""
+
+    def test_cached_old_version_is_not_served(self, job_store, fake_redis):
+        """保存後に古い内容がキャッシュへ書き戻されても新しい版を返す"""
+        storage.save_job(_new_job())
+        old_entries = dict(fake_redis.data)
+
+        job = _new_job()
+        job["download_count"] = 1
+        storage.save_job(job)
+
+        # 保存前に読み始めた読み手が、遅れて古い内容をキャッシュに入れた状況
+        fake_redis.data.update(old_entries)
+
+        assert storage.load_job("job-0001")["download_count"] == 1
+
+    def test_missing_job(self, job_store):
+        """job.jsonが無ければJobNotFoundError"""
+        with pytest.raises(storage.JobNotFoundError):
+            storage.load_job("job-missing")
+
+# 実行方法:
+# pytest tests/test_storage.py -v
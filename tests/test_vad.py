@@ -0,0 +1,85 @@
+"""
+VAD Phase テストケース
+Design原則: 89. ユーザーが学習できるようにする
+"""
+import random
+
+import numpy as np
+import pytest
+
+from pipeline.phases.pre_3_5_vad import _speech_intervals, _speech_samples_between
+
+
+def _nested_loop(speech_timestamps: list[dict], starts: list[int], ends: list[int]) -> list[int]:
+    """旧実装（セグメント × 発話区間の二重ループ）"""
+    result = []
+    for seg_start, seg_end in zip(starts, ends):
+        samples = 0
+        for ts in speech_timestamps:
+            overlap_start = max(ts['start'], seg_start)
+            overlap_end = min(ts['end'], seg_end)
+            if overlap_start < overlap_end:
+                samples += overlap_end - overlap_start
+        result.append(samples)
+    return result
+
+
+def _random_speech(rng: random.Random, count: int) -> list[dict]:
+    """時刻順で重ならない発話区間（Silero VADの出力と同じ形）"""
+    timestamps = []
+    position = 0
+    for _ in range(count):
+        start = position + rng.randint(0, 4000)
+        end = start + rng.randint(1, 8000)
+        timestamps.append({'start': start, 'end': end})
+        position = end
+    return timestamps
+
+
+class TestSpeechSamplesBetween:
+    """_speech_samples_between単体テスト"""
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_matches_nested_loop(self, seed):
+        """ランダムな発話区間・セグメントで旧実装と一致"""
+        rng = random.Random(seed)
+        speech_timestamps = _random_speech(rng, rng.randint(1, 50))
+        total = speech_timestamps[-1]['end'] + 4000
+
+        starts = [rng.randint(0, total) for _ in range(100)]
+        ends = [start + rng.randint(-100, 20000) for start in starts]  # 長さ0以下も含める
+
+        result = _speech_samples_between(
+            _speech_intervals(speech_timestamps),
+            np.array(starts, dtype=np.int64),
+            np.array(ends, dtype=np.int64)
+        )
+
+        assert result.tolist() == _nested_loop(speech_timestamps, starts, ends)
+
+    def test_boundaries(self):
+        """区間の端にちょうど接するセグメント"""
+        speech_timestamps = [{'start': 100, 'end': 200}, {'start': 300, 'end': 400}]
+        starts = [0, 100, 200, 150, 350, 400]
+        ends = [100, 200, 300, 350, 1000, 500]
+
+        result = _speech_samples_between(
+            _speech_intervals(speech_timestamps),
+            np.array(starts, dtype=np.int64),
+            np.array(ends, dtype=np.int64)
+        )
+
+        assert result.tolist() == [0, 100, 0, 100, 50, 0]
+
+    def test_no_speech(self):
+        """発話区間なしなら全て0"""
+        result = _speech_samples_between(
+            _speech_intervals([]),
+            np.array([0, 10], dtype=np.int64),
+            np.array([5, 20], dtype=np.int64)
+        )
+
+        assert result.tolist() == [0, 0]
+
+# 実行方法:
+# pytest tests/test_vad.py -v